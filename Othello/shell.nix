@@ -3,6 +3,7 @@
 pkgs.mkShell {
   buildInputs = with pkgs; [
     python3Packages.unicurses
+    python3Packages.numpy
   ];
   shellHook = ''
     python3.12 -m xonsh
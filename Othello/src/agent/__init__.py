@@ -1 +1 @@
-from .core import pick_best_turn
+from .core import pick_best_turn, profile_best_turn, search_best_turn
@@ -0,0 +1,214 @@
+"""
+Batch analysis of positions, run from the `src` directory with
+
+    python -m agent.batch positions.txt results.txt --workers 4 --depth 6
+
+With `--cache analysis.db`, the results are kept in a persistent cache, see `agent.cache`,
+shared by the workers, which open it once each, and by later runs.
+
+Every input line is a position written by `game.notation.format_position`. For every
+position, a line with the position, its best move and score is written, in the order
+of the input; `pass` and `-` are written when the player to move has no valid move.
+A line that is not a valid position is written back with `error`, its line number and
+the reason, and the other positions are still analyzed.
+"""
+
+import sys
+from argparse import ArgumentParser
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import TextIO
+
+from agent.cache import PositionCache
+from agent.core import DEFAULT_DEPTH, search_best_turn
+from game.bitboard import BitBoard
+from game.core import get_valid_moves
+from game.notation import format_move, parse_position
+from game.position import Position
+
+Analysis = tuple[Position | None, int | None]
+
+Outcome = Analysis | ValueError
+"""
+The analysis of a position, or the error if it is not a valid position.
+"""
+
+CHUNK_SIZE = 16
+"""
+Number of positions sent to a worker at once.
+"""
+
+_worker_cache: PositionCache | None = None
+"""
+The cache opened by the worker process, if any.
+"""
+
+
+def analyze_position(text: str, **options) -> Analysis:
+    """
+    Find the best move and score of a position.
+
+    Args:
+        text (str): The position, as written by `format_position`.
+        options: Options of `search_best_turn`.
+
+    Returns:
+        Analysis: The best move and its score, or None and None if the player to move
+            has no valid move.
+    """
+    snapshot, player = parse_position(text)
+    board = BitBoard.from_snapshot(snapshot)
+    if not get_valid_moves(board, player):
+        return None, None
+    return search_best_turn(board, player, **options)
+
+
+def _open_worker_cache(path: str, max_entries: int) -> None:
+    """
+    Open the cache of a worker process, closed when the process exits.
+    """
+    global _worker_cache
+    _worker_cache = PositionCache(path, max_entries)
+    Finalize(_worker_cache, _worker_cache.close, exitpriority=0)
+
+
+def _try_analyze(text: str, options: dict) -> Outcome:
+    try:
+        return analyze_position(text, **options)
+    except ValueError as error:
+        return error
+
+
+def _analyze_chunk(texts: list[str], options: dict) -> list[Outcome]:
+    if _worker_cache is not None:
+        options = {**options, "cache": _worker_cache}
+    return [_try_analyze(text, options) for text in texts]
+
+
+def analyze_positions(
+    texts: Iterable[str], workers: int = 1, max_pending: int | None = None, **options
+) -> Iterator[tuple[str, Outcome]]:
+    """
+    Analyze a stream of positions, yielding the results in the order of the positions.
+
+    The positions are read only as fast as they are analyzed: at most `max_pending`
+    chunks of positions are waiting for or being analyzed at any time, so the memory
+    used does not grow with the number of positions.
+
+    Args:
+        texts (Iterable[str]): The positions, as written by `format_position`.
+        workers (int): Number of worker processes, the positions are analyzed in this
+            process if 1.
+        max_pending (int | None): Maximum number of chunks in flight, twice the number
+            of workers if not given.
+        options: Options of `search_best_turn`. A `cache` is opened again by every
+            worker process.
+
+    Returns:
+        Iterator[tuple[str, Outcome]]: Every position with its analysis, or the error
+            if it is not a valid position.
+    """
+    if workers <= 1:
+        for text in texts:
+            yield text, _try_analyze(text, options)
+        return
+
+    max_pending = 2 * workers if max_pending is None else max_pending
+    pending: deque[tuple[list[str], Future[list[Outcome]]]] = deque()
+    chunk: list[str] = []
+    cache = options.pop("cache", None)
+    initializer, initargs = None, ()
+    if cache is not None:
+        initializer, initargs = _open_worker_cache, (cache.path, cache.max_entries)
+    with ProcessPoolExecutor(
+        workers, initializer=initializer, initargs=initargs
+    ) as pool:
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) < CHUNK_SIZE:
+                continue
+
+            pending.append((chunk, pool.submit(_analyze_chunk, chunk, options)))
+            chunk = []
+            if len(pending) >= max_pending:
+                chunk_texts, future = pending.popleft()
+                yield from zip(chunk_texts, future.result())
+
+        if chunk:
+            pending.append((chunk, pool.submit(_analyze_chunk, chunk, options)))
+        while pending:
+            chunk_texts, future = pending.popleft()
+            yield from zip(chunk_texts, future.result())
+
+
+def analyze_file(
+    input_file: TextIO, output_file: TextIO, workers: int = 1, **options
+) -> int:
+    """
+    Analyze the positions of the input file line by line and write the results.
+
+    Args:
+        input_file (TextIO): File with a position on every line, empty lines are skipped.
+        output_file (TextIO): File to write the results to.
+        workers (int): Number of worker processes.
+        options: Options of `search_best_turn`.
+
+    Returns:
+        int: Number of analyzed positions, without the invalid ones.
+    """
+    line_numbers: deque[int] = deque()
+
+    def read_texts() -> Iterator[str]:
+        for line_number, line in enumerate(input_file, 1):
+            if line.strip():
+                line_numbers.append(line_number)
+                yield line.strip()
+
+    count = 0
+    for text, outcome in analyze_positions(read_texts(), workers, **options):
+        line_number = line_numbers.popleft()
+        if isinstance(outcome, ValueError):
+            output_file.write(f"{text} error line {line_number}: {outcome}\n")
+            print(f"Line {line_number}: {outcome}", file=sys.stderr)
+            continue
+
+        move, score = outcome
+        score_text = "-" if score is None else str(score)
+        output_file.write(f"{text} {format_move(move)} {score_text}\n")
+        count += 1
+    return count
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Analyze Othello positions in batch.")
+    parser.add_argument("input", help="file with positions, - for standard input")
+    parser.add_argument("output", help="file for the results, - for standard output")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH)
+    parser.add_argument("--time-limit", type=float, default=None)
+    parser.add_argument("--cache", help="file of the persistent cache of positions")
+    args = parser.parse_args()
+
+    cache = None if args.cache is None else PositionCache(args.cache)
+
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        with input_file, output_file:
+            analyze_file(
+                input_file,
+                output_file,
+                args.workers,
+                depth=args.depth,
+                time_limit=args.time_limit,
+                cache=cache,
+            )
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Headless self-play benchmark of the engine, run from the `src` directory with
+
+    python -m agent.bench --games 10 --seed 1
+
+The games start with a few random moves (drawn from the seed) so that they differ,
+then both players play `pick_best_turn`. The results are printed as JSON, along with
+the statistics of the searches; `--profile` adds the time spent in each phase of them.
+"""
+
+import json
+from argparse import ArgumentParser
+from math import ceil
+from random import Random
+from time import perf_counter
+
+from agent.core import DEFAULT_DEPTH, pick_best_turn
+from agent.patterns import PatternWeights, load_weights
+from agent.stats import SearchStats
+from agent.transposition import TranspositionTable
+from game.bitboard import BACKENDS, BitBoard
+from game.board import Board
+from game.cell import Cell
+from game.core import get_valid_moves, is_game_over
+from game.utils import get_opposing_player
+
+
+def play_game(
+    random: Random,
+    stats: SearchStats,
+    backend: type[Board] = BitBoard,
+    size: int = 8,
+    random_plies: int = 4,
+    depth: int = DEFAULT_DEPTH,
+    time_limit: float | None = None,
+    workers: int = 1,
+    weights: PatternWeights | None = None,
+) -> list[float]:
+    """
+    Play one self-play game.
+
+    Args:
+        random (Random): Source of the random opening moves.
+        stats (SearchStats): Statistics to add the counters of the searches to.
+        backend (type[Board]): The board implementation.
+        size (int): Height and width of the board.
+        random_plies (int): Number of random moves at the start of the game.
+        depth (int): Search depth of `pick_best_turn`.
+        time_limit (float | None): Time budget of `pick_best_turn` per move.
+        workers (int): Number of processes of `pick_best_turn`.
+        weights (PatternWeights | None): Pattern weights of `pick_best_turn`.
+
+    Returns:
+        list[float]: Time taken by every searched move in seconds.
+    """
+    board = backend(size, size)
+    table = TranspositionTable()
+    player = Cell.BLACK
+    latencies = []
+    plies = 0
+
+    while not is_game_over(board):
+        moves = list(get_valid_moves(board, player))
+        if not moves:
+            player = get_opposing_player(player)
+            continue
+
+        if plies < random_plies:
+            move = random.choice(moves)
+        else:
+            start = perf_counter()
+            move = pick_best_turn(
+                board,
+                player,
+                table=table,
+                depth=depth,
+                time_limit=time_limit,
+                workers=workers,
+                stats=stats,
+                weights=weights,
+            )
+            latencies.append(perf_counter() - start)
+
+        board.put_disc(move, player)
+        player = get_opposing_player(player)
+        plies += 1
+
+    return latencies
+
+
+def run_benchmark(
+    games: int = 4, seed: int = 0, profile: bool = False, **options
+) -> dict[str, object]:
+    """
+    Play the self-play games and measure the engine.
+
+    Args:
+        games (int): Number of games.
+        seed (int): Seed of the random opening moves.
+        profile (bool): Whether to time the phases of the searches.
+        options: Options of `play_game`.
+
+    Returns:
+        dict[str, object]: The measured values.
+    """
+    random = Random(seed)
+    stats = SearchStats(profile=profile)
+    latencies: list[float] = []
+
+    start = perf_counter()
+    for _ in range(games):
+        latencies.extend(play_game(random, stats, **options))
+    elapsed = perf_counter() - start
+
+    latencies.sort()
+    return {
+        "games": games,
+        "moves": len(latencies),
+        "nodes": stats.nodes,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed,
+        "nodes_per_second": stats.nodes / stats.time if stats.time else 0.0,
+        "average_move_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+        "p99_move_latency": (
+            latencies[ceil(0.99 * len(latencies)) - 1] if latencies else 0.0
+        ),
+        "search": stats.to_dict(),
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Self-play benchmark of the Othello engine.")
+    parser.add_argument("--games", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=BACKENDS, default="bitboard")
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--random-plies", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH)
+    parser.add_argument("--time-limit", type=float, default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--weights", help="pattern weights evaluating the positions")
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        args.games,
+        args.seed,
+        args.profile,
+        backend=BACKENDS[args.backend],
+        size=args.size,
+        random_plies=args.random_plies,
+        depth=args.depth,
+        time_limit=args.time_limit,
+        workers=args.workers,
+        weights=None if args.weights is None else load_weights(args.weights),
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
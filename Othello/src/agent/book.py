@@ -0,0 +1,196 @@
+"""
+Opening book of precomputed best moves, keyed by the canonical key of the position, so
+that the images of a position by the symmetries of the board are stored once, see
+`game.symmetry`.
+
+Build a book from the `src` directory with
+
+    python -m agent.book --output ../assets/opening_book.bin --plies 4 --depth 6
+
+The book file starts with a header followed by records sorted by their key, so a
+position is found by a binary search over the memory-mapped file.
+"""
+
+import mmap
+import os
+import struct
+from argparse import ArgumentParser
+from types import TracebackType
+
+from agent.search import Search
+from agent.transposition import TranspositionTable
+from game.bitboard import BitBoard
+from game.board import Board
+from game.cell import Cell
+from game.core import get_valid_moves, is_game_over
+from game.position import Position
+from game.symmetry import get_canonical_key, get_inverse, transform_position
+from game.utils import get_opposing_player
+
+MAGIC = b"OTHB"
+VERSION = 2
+HEADER = struct.Struct("<4sHHHI")
+"""
+Magic, version, height, width and number of records.
+"""
+RECORD = struct.Struct("<QHh")
+"""
+Canonical key of the position, best move in the frame of the canonical form as
+`row * width + col` and its score.
+"""
+
+
+class OpeningBook:
+    """
+    Read-only opening book, memory-mapped from its file.
+
+    Only the pages touched by the binary search are read from the disk, so opening
+    and querying a book is fast regardless of its size.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the book.
+
+        Args:
+            path (str): Path to the book file.
+
+        Raises:
+            ValueError: If the file is not a book.
+        """
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is not an opening book")
+        magic, version, self.height, self.width, self.size = HEADER.unpack_from(
+            self._map
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an opening book")
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def lookup(self, board: Board, player: Cell) -> tuple[Position, int] | None:
+        """
+        Find the best move of the player in the current position of the board.
+
+        Args:
+            board (Board): The game board.
+            player (Cell): The player who is making the move.
+
+        Returns:
+            tuple[Position, int] | None: The best move and its score, or None if the
+                position is not in the book.
+        """
+        if (board.height, board.width) != (self.height, self.width):
+            return None
+
+        key, symmetry = get_canonical_key(board, player)
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            record_key, move, score = RECORD.unpack_from(
+                self._map, HEADER.size + middle * RECORD.size
+            )
+            if record_key == key:
+                inverse = get_inverse(symmetry, self.height, self.width)
+                move = transform_position(
+                    Position(*divmod(move, self.width)), inverse, self.width
+                )
+                return move, score
+            if record_key < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return None
+
+
+def build_book(
+    path: str, height: int = 8, width: int = 8, plies: int = 4, depth: int = 6
+) -> int:
+    """
+    Build a book of all positions reachable from the start position in the given number
+    of plies, each searched to the given depth. The images of a position already in
+    the book are skipped with the positions after them, which are images too.
+
+    Args:
+        path (str): Path to the book file to write, whose directory is created if
+            needed.
+        height (int): Height of the board.
+        width (int): Width of the board.
+        plies (int): Number of plies from the start position to cover.
+        depth (int): Search depth of every position.
+
+    Returns:
+        int: Number of positions in the book.
+    """
+    board = BitBoard(height, width)
+    table = TranspositionTable()
+    records: dict[int, tuple[int, int]] = {}
+
+    def visit(player: Cell, ply: int) -> None:
+        if ply > plies or is_game_over(board):
+            return
+
+        moves = list(get_valid_moves(board, player))
+        if not moves:
+            visit(get_opposing_player(player), ply)
+            return
+
+        key, symmetry = get_canonical_key(board, player)
+        if key in records:
+            return
+
+        table.new_search()
+        move, score = Search(board, player, table).search_root(depth)
+        move = transform_position(move, symmetry, width)
+        records[key] = (move.row * width + move.col, score)
+
+        for move in moves:
+            board.put_disc(move, player)
+            visit(get_opposing_player(player), ply + 1)
+            board.undo()
+
+    visit(Cell.BLACK, 0)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, height, width, len(records)))
+        for key in sorted(records):
+            file.write(RECORD.pack(key, *records[key]))
+
+    return len(records)
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Build an opening book of Othello.")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--plies", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=6)
+    args = parser.parse_args()
+
+    size = build_book(args.output, args.height, args.width, args.plies, args.depth)
+    print(f"{size} positions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Persistent cache of searched positions, shared by the runs and processes using the same
+file, so that repeated analyses of the same positions get cheaper over time.
+
+The cache is an SQLite database in write-ahead logging mode: any number of processes
+read it concurrently while one of them writes. Lookups only read, the times at which
+the entries were used are written in batches. Every entry holds the depth, score and
+best move of a position, keyed by its canonical key with the player to move, so that
+the images of a position by the symmetries of the board share an entry, see
+`game.symmetry`. When the cache grows past its size, the least recently used entries
+are evicted.
+"""
+
+import sqlite3
+import time
+from collections import namedtuple
+
+from game.board import Board
+from game.cell import Cell
+from game.position import Position
+from game.symmetry import (
+    Symmetry,
+    get_canonical_key,
+    get_inverse,
+    transform_position,
+)
+
+MAX_ENTRIES = 1_000_000
+"""
+Default number of entries above which the least recently used ones are evicted.
+"""
+
+EVICTION_INTERVAL = 1000
+"""
+Number of stores of a connection between two checks of the size of the cache, and of
+lookups between two writes of the times at which the entries were used.
+"""
+
+SOLVED_DEPTH = 10_000
+"""
+Depth of the entries of solved positions, deeper than any search.
+"""
+
+SCHEMA_VERSION = 1
+"""
+Version of the keys and moves of the entries, stored as the user version of
+the database, whose entries are dropped when it differs.
+"""
+
+CacheEntry = namedtuple("CacheEntry", ["depth", "score", "move"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    key INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    move INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (key, height, width)
+);
+CREATE INDEX IF NOT EXISTS positions_used ON positions (used);
+"""
+
+
+def get_key(board: Board, player: Cell) -> tuple[int, Symmetry]:
+    """
+    Get the canonical key of the position with the given player to move, as a signed
+    64-bit integer of SQLite, and the symmetry mapping the position to its canonical form.
+    """
+    key, symmetry = get_canonical_key(board, player)
+    return (key - (1 << 64) if key >= 1 << 63 else key), symmetry
+
+
+class PositionCache:
+    """
+    On-disk cache of searched positions, see the module.
+
+    Scores depend on the evaluation of the search, so a cache file should only be used
+    with one evaluation. Every process must open its own cache, which should be closed
+    so that the times of its last lookups are written and its size is enforced.
+    """
+
+    def __init__(self, path: str, max_entries: int = MAX_ENTRIES) -> None:
+        """
+        Open the cache, creating its file if needed.
+
+        Args:
+            path (str): Path to the database file.
+            max_entries (int): Number of entries above which the least recently used
+                ones are evicted.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            self._connection.execute("DROP TABLE IF EXISTS positions")
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._connection.executescript(SCHEMA)
+        self._stores = 0
+        self._used: list[tuple[float, int, int, int]] = []
+        """
+        Times of the lookups of entries not written yet, with their keys.
+        """
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Write the pending times of use, evict the entries above the size of the cache
+        and close the connection.
+        """
+        self.evict()
+        self._connection.close()
+
+    def lookup(self, board: Board, player: Cell) -> CacheEntry | None:
+        """
+        Find the current position of the board, marking it as used. The time of use
+        is written with the next batch.
+
+        Args:
+            board (Board): The game board.
+            player (Cell): The player to move.
+
+        Returns:
+            CacheEntry | None: The depth, score and best move of the position, or None
+                if it is not cached.
+        """
+        key, symmetry = get_key(board, player)
+        key = (key, board.height, board.width)
+        row = self._connection.execute(
+            "SELECT depth, score, move FROM positions"
+            " WHERE key = ? AND height = ? AND width = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+
+        self._used.append((time.time(), *key))
+        if len(self._used) >= EVICTION_INTERVAL:
+            self._write_used()
+        depth, score, move = row
+        inverse = get_inverse(symmetry, board.height, board.width)
+        move = transform_position(
+            Position(*divmod(move, board.width)), inverse, board.width
+        )
+        return CacheEntry(depth, score, move)
+
+    def store(
+        self, board: Board, player: Cell, depth: int, score: int, move: Position
+    ) -> None:
+        """
+        Store the result of a search of the current position of the board, unless
+        the position is cached with a deeper search.
+
+        Args:
+            board (Board): The game board.
+            player (Cell): The player to move.
+            depth (int): Depth of the search, `SOLVED_DEPTH` if the game was solved.
+            score (int): Score of the best move for the player.
+            move (Position): The best move.
+        """
+        key, symmetry = get_key(board, player)
+        move = transform_position(move, symmetry, board.width)
+        self._connection.execute(
+            "INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT DO UPDATE SET depth = excluded.depth,"
+            " score = excluded.score, move = excluded.move, used = excluded.used"
+            " WHERE excluded.depth >= positions.depth",
+            (
+                key,
+                board.height,
+                board.width,
+                depth,
+                score,
+                move.row * board.width + move.col,
+                time.time(),
+            ),
+        )
+
+        self._stores += 1
+        if self._stores % EVICTION_INTERVAL == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Evict the least recently used entries above the size of the cache.
+
+        Returns:
+            int: Number of evicted entries.
+        """
+        self._write_used()
+        # One statement, so that processes evicting at the same time do not evict more
+        return self._connection.execute(
+            "DELETE FROM positions WHERE rowid IN (SELECT rowid FROM positions"
+            " ORDER BY used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+
+    def _write_used(self) -> None:
+        """
+        Write the pending times of use of the entries in one transaction.
+        """
+        if not self._used:
+            return
+        with self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(
+                "UPDATE positions SET used = ?"
+                " WHERE key = ? AND height = ? AND width = ? AND used < ?",
+                [(used, *key, used) for used, *key in self._used],
+            )
+        self._used.clear()
@@ -1,15 +1,37 @@
-from agent.heuristic import evaluate_board, evaluate_move
+from threading import Event
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING
+
+from agent.cache import SOLVED_DEPTH, PositionCache
+from agent.endgame import ENDGAME_EMPTIES, EndgameSolver
+from agent.parallel import ParallelSearch
+from agent.patterns import PatternWeights
+from agent.search import TABLE, Search
+from agent.stats import SearchStats
+from agent.transposition import TranspositionTable
+from agent.utils import INFINITY, SearchTimeout
 from game.board import Board
 from game.cell import Cell
-from game.core import can_play, get_scores, get_valid_moves, is_game_over
+from game.core import get_valid_moves
 from game.position import Position
-from game.rules import is_valid_move
-from game.utils import get_opposing_player
 
-INFINITY = 10**10
+if TYPE_CHECKING:
+    from agent.book import OpeningBook
+
+DEFAULT_DEPTH = 4
+"""
+Number of plies searched when no time limit is given.
+"""
+
+ASPIRATION_WINDOW = 4
+"""
+Half-width of the window in which an iteration of iterative deepening is searched first,
+around the score of the iteration two plies shallower: the scores of consecutive
+iterations differ too much, as they end on the moves of different players.
+"""
 
 
-def pick_best_turn(board: Board, player: Cell) -> Position:
+def pick_best_turn(board: Board, player: Cell, **options) -> Position:
     """
     Pick the best turn for the current player.
 
@@ -17,80 +39,216 @@ def pick_best_turn(board: Board, player: Cell) -> Position:
 
     Args:
         board (Board): The game board.
-        current_player (Cell): The player who is making the move.
-        cursor (Position): The cursor position.
+        player (Cell): The player who is making the move.
+        options: Options of the search, see `search_best_turn`.
+
+    Returns:
+        Position: The best move.
+    """
+    return search_best_turn(board, player, **options)[0]
+
+
+def profile_best_turn(
+    board: Board, player: Cell, profile: bool = False, **options
+) -> tuple[Position, SearchStats]:
+    """
+    Pick the best turn for the current player along with the statistics of its search.
+
+    There MUST be at least one valid move for the current player.
+
+    Args:
+        board (Board): The game board.
+        player (Cell): The player who is making the move.
+        profile (bool): Whether to time the phases of the search as well.
+        options: Options of the search, see `search_best_turn`.
+
+    Returns:
+        tuple[Position, SearchStats]: The best move and the statistics of its search.
+    """
+    stats = SearchStats(profile=profile)
+    move, _ = search_best_turn(board, player, stats=stats, **options)
+    return move, stats
+
+
+def search_best_turn(
+    board: Board,
+    player: Cell,
+    table: TranspositionTable | None = None,
+    depth: int = DEFAULT_DEPTH,
+    time_limit: float | None = None,
+    workers: int = 1,
+    endgame_empties: int = ENDGAME_EMPTIES,
+    stats: SearchStats | None = None,
+    book: "OpeningBook | None" = None,
+    stop: Event | None = None,
+    weights: PatternWeights | None = None,
+    cache: PositionCache | None = None,
+) -> tuple[Position, int | None]:
+    """
+    Search the best turn for the current player and its score.
+
+    There MUST be at least one valid move for the current player.
+
+    Without a time limit, the moves are searched to the given depth. With a time limit,
+    the search is deepened iteratively, each iteration starting with the best move of
+    the previous one within an aspiration window, until the time runs out; the best move
+    of the deepest completed iteration is returned.
+
+    Args:
+        board (Board): The game board.
+        player (Cell): The player who is making the move.
+        table (TranspositionTable | None): The transposition table to use,
+            the shared one if not given.
+        depth (int): Number of plies to search, including the player's move.
+        time_limit (float | None): Time budget of the search in seconds.
+        workers (int): Number of processes the moves are split across,
+            the moves are searched in this process if 1.
+        endgame_empties (int): Number of empty squares from which the game is solved
+            exactly instead; with a time limit, the solver gets half of it and the rest
+            is left for the usual search if it does not finish.
+        stats (SearchStats | None): Statistics to add the counters of this search to,
+            the phases of the search are timed if they are profiling.
+        book (OpeningBook | None): Opening book answering the positions it contains
+            without a search.
+        stop (Event | None): Event which stops the search like the time limit when it
+            is set, e.g. from another thread.
+        weights (PatternWeights | None): Pattern weights evaluating the positions,
+            which are scored by their disc differential if not given.
+        cache (PositionCache | None): Persistent cache of searched positions, which
+            answers without a search when its entry is at least as deep as the depth,
+            or solved when the time is limited; with a time limit, the search is
+            otherwise deepened from its entry. The result of the search is stored in it.
+
+    Returns:
+        tuple[Position, int | None]: The best move and its score for the player, None
+            if the time ran out before any search completed.
+
+    Raises:
+        SearchTimeout: If the search is stopped when the time is not limited.
     """
+    if book is not None:
+        entry = book.lookup(board, player)
+        if entry is not None and entry[0] in get_valid_moves(board, player):
+            return entry
 
-    def alpha_beta(current_player: Cell, depth: int, alpha: int, beta: int) -> int:
-        """
-        Alpha-beta pruning algorithm.
-
-        Args:
-            board (Board): The game board.
-            current_player (Cell): The player who is making the move.
-            depth (int): The depth of the search tree.
-            alpha (int): The alpha value.
-            beta (int): The beta value.
-
-        Returns:
-            int: The best score.
-        """
-        if depth == 0 or is_game_over(board):
-            score = get_scores(board)
-            return score[current_player] - score[get_opposing_player(current_player)]
-
-        if not can_play(board, current_player):
-            return alpha_beta(
-                get_opposing_player(current_player), depth - 1, alpha, beta
+    known = None
+    if cache is not None:
+        known = cache.lookup(board, player)
+        if known is not None and known.move in get_valid_moves(board, player):
+            if known.depth >= (depth if time_limit is None else SOLVED_DEPTH):
+                return known.move, known.score
+        else:
+            known = None
+
+    table = TABLE if table is None else table
+    table.new_search()
+
+    start = perf_counter()
+    run_stats = SearchStats(profile=stats is not None and stats.profile)
+    history_length = len(board.history)
+    try:
+        deadline = None if time_limit is None else monotonic() + time_limit
+        if board.count_discs(Cell.EMPTY) <= endgame_empties:
+            solver_deadline = (
+                None if time_limit is None else monotonic() + time_limit / 2
             )
+            solver = EndgameSolver(board, solver_deadline, stop)
+            try:
+                move, score = solver.solve(player)
+            except SearchTimeout:
+                pass
+            else:
+                if cache is not None:
+                    cache.store(board, player, SOLVED_DEPTH, score, move)
+                return move, score
+            finally:
+                run_stats.nodes += solver.nodes
 
-        if current_player == player:
-            value = -INFINITY
-            for move in sorted(
-                get_valid_moves(board, current_player),
-                key=lambda move: evaluate_move(board, move, current_player),
-            ):
-                board.put_disc(move, current_player)
-                value = max(
-                    value,
-                    alpha_beta(
-                        get_opposing_player(current_player), depth - 1, alpha, beta
-                    ),
-                )
-                alpha = max(alpha, value)
-                board.undo()
-                if alpha >= beta:
-                    break
-            return value
+        if workers > 1:
+            search = ParallelSearch(
+                board,
+                player,
+                table,
+                deadline,
+                workers,
+                stats=run_stats,
+                stop=stop,
+                weights=weights,
+            )
         else:
-            value = INFINITY
-            for move in sorted(
-                get_valid_moves(board, current_player),
-                key=lambda move: evaluate_move(board, move, current_player),
+            search = Search(board, player, table, deadline, run_stats, stop, weights)
+
+        if time_limit is None:
+            move, score = _search_iteration(search, depth, None, None, run_stats)
+            if cache is not None:
+                cache.store(board, player, depth, score, move)
+            return move, score
+
+        best_move, best_score = None, None
+        scores: dict[int, int] = {}
+        first_depth, completed_depth = 1, None
+        if known is not None:
+            best_move, best_score = known.move, known.score
+            scores[known.depth] = known.score
+            first_depth = known.depth + 1
+        try:
+            for iteration_depth in range(
+                first_depth, board.count_discs(Cell.EMPTY) + 1
             ):
-                board.put_disc(move, current_player)
-                value = min(
-                    value,
-                    alpha_beta(
-                        get_opposing_player(current_player), depth - 1, alpha, beta
-                    ),
+                best_move, best_score = _search_iteration(
+                    search,
+                    iteration_depth,
+                    best_move,
+                    scores.get(iteration_depth - 2),
+                    run_stats,
                 )
-                beta = min(beta, value)
-                board.undo()
-                if alpha >= beta:
-                    break
-            return value
-
-    best_score = -INFINITY
-    best_move = Position(
-        0, 0
-    )  # Dummy move, this will be replaced if there are valid moves
-    for move in get_valid_moves(board, player):
-        board.put_disc(move, player)
-        score = alpha_beta(get_opposing_player(player), 3, -INFINITY, INFINITY)
-        board.undo()
-        if score > best_score:
-            best_score = score
-            best_move = move
-
-    return best_move
+                scores[iteration_depth] = best_score
+                completed_depth = iteration_depth
+        except SearchTimeout:
+            pass
+    finally:
+        # A stopped search leaves its moves on the board
+        while len(board.history) > history_length:
+            board.undo()
+        if stats is not None:
+            run_stats.searches = 1
+            run_stats.time = perf_counter() - start
+            stats.merge(run_stats)
+
+    # The iterative deepening is over, with the board restored
+    if best_move is None:
+        return next(iter(get_valid_moves(board, player))), None
+    if cache is not None and completed_depth is not None:
+        cache.store(board, player, completed_depth, best_score, best_move)
+    return best_move, best_score
+
+
+def _search_iteration(
+    search: Search | ParallelSearch,
+    depth: int,
+    first_move: Position | None,
+    guess: int | None,
+    stats: SearchStats,
+) -> tuple[Position, int]:
+    """
+    Search the moves to the given depth, within the aspiration window around the guessed
+    score if given, widened to the failed side while the score falls outside of it.
+    """
+    start, nodes = perf_counter(), stats.nodes
+    if guess is None:
+        alpha, beta = -INFINITY, INFINITY
+    else:
+        alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+
+    while True:
+        move, score = search.search_root(depth, first_move, alpha, beta)
+        if score <= alpha and alpha > -INFINITY:
+            alpha = -INFINITY
+        elif score >= beta and beta < INFINITY:
+            beta = INFINITY
+            first_move = move
+        else:
+            break
+
+    stats.add_iteration(depth, stats.nodes - nodes, perf_counter() - start)
+    return move, score
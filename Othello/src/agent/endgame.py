@@ -0,0 +1,173 @@
+from threading import Event
+from time import monotonic
+
+from agent.utils import INFINITY, SearchTimeout
+from game.bitboard import Geometry, from_flat, get_flips, get_geometry, get_moves
+from game.board import Board
+from game.cell import Cell
+from game.position import Position
+
+ENDGAME_EMPTIES = 10
+"""
+Number of empty squares from which the endgame is solved exactly.
+"""
+
+FASTEST_FIRST_EMPTIES = 7
+"""
+Number of empty squares from which the moves are ordered by the opponent's mobility;
+with fewer empties, ordering by parity is cheaper than what it saves.
+"""
+
+
+def get_regions(geometry: Geometry) -> tuple[int, ...]:
+    """
+    Split the board into its four quadrants, as masks in the bit layout of the geometry.
+    """
+    regions = [0, 0, 0, 0]
+    for row in range(geometry.height):
+        for col in range(geometry.width):
+            quadrant = 2 * (row >= geometry.height // 2) + (col >= geometry.width // 2)
+            regions[quadrant] |= 1 << (row * geometry.stride + col)
+    return tuple(region for region in regions if region)
+
+
+class EndgameSolver:
+    """
+    Exact search of the final disc differential of a position with few empty squares.
+
+    The solver works on the disc masks directly and tries only the squares of its list
+    of empties. Moves into regions with an odd number of empties are tried first,
+    as the player who moves last into a region usually keeps its discs, and with more
+    empties the moves leaving the opponent the fewest replies go first.
+    """
+
+    def __init__(
+        self, board: Board, deadline: float | None = None, stop: Event | None = None
+    ) -> None:
+        """
+        Initialize the solver with the current position of the board.
+
+        Args:
+            board (Board): The game board.
+            deadline (float | None): The `time.monotonic()` time when the search is stopped
+                by raising `SearchTimeout`, or None if the time is not limited.
+            stop (Event | None): Event which stops the search like the deadline when it
+                is set, e.g. from another thread.
+        """
+        snapshot = board.snapshot()
+        self.geometry = get_geometry(board.height, board.width)
+        self.black = from_flat(snapshot.black, self.geometry)
+        self.white = from_flat(snapshot.white, self.geometry)
+        self.regions = get_regions(self.geometry)
+        self.empties = [
+            index
+            for index, position in enumerate(self.geometry.positions)
+            if position is not None and not (self.black | self.white) >> index & 1
+        ]
+        self.deadline = deadline
+        self.stop = stop
+        self.nodes = 0
+
+    def solve(self, player: Cell) -> tuple[Position, int]:
+        """
+        Find the best move of the player and the final disc differential it leads to
+        with perfect play of both sides.
+
+        There MUST be at least one valid move for the player.
+
+        Args:
+            player (Cell): The player who is making the move.
+
+        Returns:
+            tuple[Position, int]: The best move and the player's discs minus
+                the opponent's discs at the end of the game.
+
+        Raises:
+            SearchTimeout: If the deadline of the search has passed.
+        """
+        if player == Cell.BLACK:
+            own, opponent = self.black, self.white
+        else:
+            own, opponent = self.white, self.black
+
+        best_move = None
+        alpha = -INFINITY
+        for index, flips in self._ordered_moves(own, opponent):
+            position = self.empties.index(index)
+            del self.empties[position]
+            score = -self._solve(
+                opponent & ~flips, own | flips | 1 << index, -INFINITY, -alpha, False
+            )
+            self.empties.insert(position, index)
+            if score > alpha:
+                alpha = score
+                best_move = self.geometry.positions[index]
+
+        assert best_move is not None, "The player has no valid move"
+        return best_move, alpha
+
+    def _solve(
+        self, own: int, opponent: int, alpha: int, beta: int, passed: bool
+    ) -> int:
+        self.nodes += 1
+        if self.deadline is not None and monotonic() > self.deadline:
+            raise SearchTimeout()
+        if self.stop is not None and self.stop.is_set():
+            raise SearchTimeout()
+
+        moves = self._ordered_moves(own, opponent)
+        if not moves:
+            if passed:
+                return own.bit_count() - opponent.bit_count()
+            return -self._solve(opponent, own, -beta, -alpha, True)
+
+        empties = self.empties
+        value = -INFINITY
+        for index, flips in moves:
+            position = empties.index(index)
+            del empties[position]
+            score = -self._solve(
+                opponent & ~flips, own | flips | 1 << index, -beta, -alpha, False
+            )
+            empties.insert(position, index)
+            if score > value:
+                value = score
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        return value
+
+    def _ordered_moves(self, own: int, opponent: int) -> list[tuple[int, int]]:
+        """
+        Get the valid moves among the empties with the discs they flip, in search order.
+        """
+        moves = []
+        for index in self.empties:
+            flips = get_flips(own, opponent, 1 << index, self.geometry)
+            if flips:
+                moves.append((index, flips))
+
+        if len(moves) < 2:
+            return moves
+
+        empty = self.geometry.full & ~(own | opponent)
+        odd = 0
+        for region in self.regions:
+            if (empty & region).bit_count() & 1:
+                odd |= region
+
+        if len(self.empties) >= FASTEST_FIRST_EMPTIES:
+            moves.sort(
+                key=lambda move: (
+                    get_moves(
+                        opponent & ~move[1],
+                        own | move[1] | 1 << move[0],
+                        self.geometry,
+                    ).bit_count(),
+                    not odd >> move[0] & 1,
+                )
+            )
+        else:
+            moves.sort(key=lambda move: not odd >> move[0] & 1)
+        return moves
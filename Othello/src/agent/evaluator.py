@@ -0,0 +1,280 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from functools import cache
+from typing import AbstractSet
+
+from game.board import Board
+from game.cell import Cell
+from game.position import Position
+
+SAFE_DIRECTIONS = ((0, 1), (1, 1), (1, 0))
+"""
+The directions in which `heuristic.evaluate_cell` counts the safe runs of discs.
+"""
+
+Lines = tuple[tuple[Position, ...], ...]
+
+
+@cache
+def get_lines(height: int, width: int) -> tuple[Lines, dict[Position, list[int]]]:
+    """
+    Get the lines of a board of the given size in the safe directions.
+
+    Args:
+        height (int): Height of the board.
+        width (int): Width of the board.
+
+    Returns:
+        tuple[Lines, dict[Position, list[int]]]: The lines with at least two squares,
+            each ordered towards the edge it ends at, and the indices of the lines passing
+            through every square.
+    """
+    lines = []
+    for row_dir, col_dir in SAFE_DIRECTIONS:
+        for row in range(height):
+            for col in range(width):
+                if 0 <= row - row_dir < height and 0 <= col - col_dir < width:
+                    continue  # Not the first square of its line
+
+                line = []
+                position = Position(row, col)
+                while 0 <= position.row < height and 0 <= position.col < width:
+                    line.append(position)
+                    position = Position(position.row + row_dir, position.col + col_dir)
+                if len(line) > 1:
+                    lines.append(tuple(line))
+
+    square_lines: dict[Position, list[int]] = {
+        Position(row, col): [] for row in range(height) for col in range(width)
+    }
+    for index, line in enumerate(lines):
+        for position in line:
+            square_lines[position].append(index)
+
+    return tuple(lines), square_lines
+
+
+class BoardFollower(ABC):
+    """
+    Base of the evaluations of a board which are kept up to date with the moves made on
+    the board and undone, by applying and reverting the changes of every move.
+
+    Subclasses implement `_reset`, `_apply` and `_revert`. Changes to the board that
+    are not recorded in its history are not followed.
+    """
+
+    def __init__(self, board: Board) -> None:
+        """
+        Initialize the evaluation with the current position of the board.
+
+        Args:
+            board (Board): The game board.
+        """
+        self.board = board
+        self._restart()
+
+    @abstractmethod
+    def _reset(self) -> None:
+        """
+        Compute the evaluation from scratch.
+        """
+
+    @abstractmethod
+    def _apply(self, position: Position, outflanked_discs: list[Position]) -> object:
+        """
+        Apply the last move of the board, whose discs were already changed.
+
+        Returns:
+            object: The changes, passed to `_revert` when the move is undone.
+        """
+
+    @abstractmethod
+    def _revert(self, changes: object) -> None:
+        """
+        Revert the changes of a move which was undone.
+        """
+
+    def _restart(self) -> None:
+        self._reset()
+        history = self.board.history
+        self._base = len(history)
+        self._anchor = history[-1] if history else None
+        """
+        The last move of the board when the evaluation was computed from scratch,
+        which must still be in the history for the evaluation to be followed.
+        """
+        self._records: list[object] = []
+        self._changes: list[object] = []
+
+    def sync(self) -> None:
+        """
+        Revert the moves that were undone on the board since the last call and apply
+        the moves that were made. Only one new move can be applied, so calling this after
+        every move keeps the evaluation from being computed from scratch.
+        """
+        history = self.board.history
+        if len(history) < self._base or (
+            self._base and history[self._base - 1] is not self._anchor
+        ):
+            self._restart()
+            return
+
+        while self._records and (
+            self._base + len(self._records) > len(history)
+            or history[self._base + len(self._records) - 1] is not self._records[-1]
+        ):
+            self._records.pop()
+            self._revert(self._changes.pop())
+
+        missing = len(history) - self._base - len(self._records)
+        if missing > 1:
+            # The intermediate positions are gone, so the changes could not be reverted
+            self._restart()
+        elif missing == 1:
+            self._changes.append(self._apply(*self.board.get_move(len(history) - 1)))
+            self._records.append(history[-1])
+
+
+class IncrementalEvaluator(BoardFollower):
+    """
+    Evaluation of the board by `heuristic.evaluate_board`, kept up to date with the moves
+    made on the board and undone.
+
+    `evaluate_board` counts for every square and safe direction whether the player's discs
+    run from the next square up to the edge. Along a line in that direction, this is the
+    length of the player's run at the end of the line, except for the first square of
+    the line. The evaluator keeps the runs of both players on every line and, when discs
+    change, recomputes only the lines through them.
+    """
+
+    def __init__(self, board: Board) -> None:
+        """
+        Initialize the evaluator with the current position of the board.
+
+        Args:
+            board (Board): The game board.
+        """
+        self.lines, self.square_lines = get_lines(board.height, board.width)
+        super().__init__(board)
+
+    def evaluate(self, current_player: Cell) -> int:
+        """
+        Evaluate the board for the current player, equal to `evaluate_board`.
+
+        Args:
+            current_player (Cell): The player who is making the move.
+
+        Returns:
+            int: The board evaluation.
+        """
+        self.sync()
+        return self.totals[current_player]
+
+    def evaluate_move(self, move: Position, current_player: Cell) -> int:
+        """
+        Evaluate the move for the current player without making it, equal to
+        `evaluate_move`. Only the lines through the changed discs are walked.
+
+        Args:
+            move (Position): The move to evaluate.
+            current_player (Cell): The player who is making the move.
+
+        Returns:
+            int: The move evaluation.
+        """
+        return self.evaluate_moves((move,), current_player)[0][0]
+
+    def evaluate_moves(
+        self, moves: Iterable[Position], current_player: Cell
+    ) -> list[tuple[int, list[Position]]]:
+        """
+        Evaluate all the moves of a position for the current player in one pass, each
+        equal to `evaluate_move`, along with the discs every move outflanks, which can
+        be passed to `Board.put_disc` instead of computing them again.
+
+        Args:
+            moves (Iterable[Position]): The moves to evaluate.
+            current_player (Cell): The player who is making the moves.
+
+        Returns:
+            list[tuple[int, list[Position]]]: The evaluation and the outflanked discs
+                of every move, in the order of the moves.
+        """
+        self.sync()
+        board, lines, square_lines = self.board, self.lines, self.square_lines
+        runs = self.runs[current_player]
+        total = self.totals[current_player]
+
+        scored = []
+        for move in moves:
+            outflanked_discs = list(board.get_outflanked_discs(move, current_player))
+            changed = {move, *outflanked_discs}
+            score = total
+            for index in {
+                index for square in changed for index in square_lines[square]
+            }:
+                limit = len(lines[index]) - 1
+                new_run = self._run(index, current_player, changed)
+                score += min(new_run, limit) - min(runs[index], limit)
+            scored.append((score, outflanked_discs))
+        return scored
+
+    def _run(
+        self, index: int, player: Cell, changed: AbstractSet[Position] = frozenset()
+    ) -> int:
+        """
+        Get the length of the player's run at the end of the line, as if the changed
+        squares were the player's.
+        """
+        board = self.board
+        run = 0
+        for position in reversed(self.lines[index]):
+            if position not in changed and board[position.row][position.col] != player:
+                break
+            run += 1
+        return run
+
+    def _reset(self) -> None:
+        """
+        Compute all runs from scratch.
+        """
+        self.runs = {
+            player: [self._run(index, player) for index in range(len(self.lines))]
+            for player in (Cell.BLACK, Cell.WHITE)
+        }
+        self.totals = {
+            player: sum(
+                min(run, len(line) - 1)
+                for run, line in zip(self.runs[player], self.lines)
+            )
+            for player in (Cell.BLACK, Cell.WHITE)
+        }
+
+    def _apply(
+        self, position: Position, outflanked_discs: list[Position]
+    ) -> list[tuple[int, int, int]]:
+        indices = {
+            index
+            for square in (position, *outflanked_discs)
+            for index in self.square_lines[square]
+        }
+
+        changes = []
+        for index in indices:
+            limit = len(self.lines[index]) - 1
+            black, white = self.runs[Cell.BLACK][index], self.runs[Cell.WHITE][index]
+            changes.append((index, black, white))
+            for player, old_run in ((Cell.BLACK, black), (Cell.WHITE, white)):
+                new_run = self._run(index, player)
+                self.runs[player][index] = new_run
+                self.totals[player] += min(new_run, limit) - min(old_run, limit)
+
+        return changes
+
+    def _revert(self, changes: list[tuple[int, int, int]]) -> None:
+        for index, black, white in changes:
+            limit = len(self.lines[index]) - 1
+            for player, old_run in ((Cell.BLACK, black), (Cell.WHITE, white)):
+                new_run = self.runs[player][index]
+                self.runs[player][index] = old_run
+                self.totals[player] += min(old_run, limit) - min(new_run, limit)
@@ -0,0 +1,232 @@
+"""
+Offline fitting of the weights of `agent.patterns` from played games, run from the `src`
+directory with
+
+    python -m agent.fitting play games.bin --games 500 --depth 2
+    python -m agent.fitting fit games.bin --output ../assets/patterns.bin
+
+`play` appends self-play games to a file of game records, see `game.record`, and can
+play with the weights of a previous fit to improve on them. `fit` learns the weights
+from the games of the given files by stochastic gradient descent on the squared error
+between the evaluation of every position and the final disc differential of its game.
+"""
+
+from argparse import ArgumentParser
+from array import array
+from collections.abc import Iterable
+from math import sqrt
+from random import Random
+
+from agent.core import pick_best_turn
+from agent.patterns import (
+    PHASES,
+    PatternWeights,
+    get_indices,
+    get_phase,
+    load_weights,
+)
+from agent.transposition import TranspositionTable
+from game.bitboard import BitBoard
+from game.board import Snapshot
+from game.cell import Cell
+from game.core import get_valid_moves, is_game_over
+from game.position import Position
+from game.record import (
+    GameRecord,
+    create_record,
+    iterate_positions,
+    read_records,
+    replay,
+    write_record,
+)
+from game.utils import get_opposing_player
+
+Sample = tuple[int, list[int], int]
+"""
+Phase of a position, the indices of its patterns and the final disc differential
+for black.
+"""
+
+
+def play_games(
+    path: str,
+    games: int,
+    seed: int = 0,
+    size: int = 8,
+    random_plies: int = 8,
+    depth: int = 2,
+    weights: PatternWeights | None = None,
+) -> None:
+    """
+    Play self-play games and append their records to a file.
+
+    Args:
+        path (str): Path to the file of game records.
+        games (int): Number of games.
+        seed (int): Seed of the random opening moves.
+        size (int): Height and width of the board.
+        random_plies (int): Number of random moves at the start of every game.
+        depth (int): Search depth of the other moves.
+        weights (PatternWeights | None): Pattern weights evaluating the positions.
+    """
+    random = Random(seed)
+    table = TranspositionTable()
+    with open(path, "ab") as file:
+        for _ in range(games):
+            board = BitBoard(size, size)
+            player = Cell.BLACK
+            moves: list[Position] = []
+            while not is_game_over(board):
+                valid_moves = list(get_valid_moves(board, player))
+                if valid_moves:
+                    if len(moves) < random_plies:
+                        move = random.choice(valid_moves)
+                    else:
+                        move = pick_best_turn(
+                            board,
+                            player,
+                            table=table,
+                            depth=depth,
+                            endgame_empties=0,
+                            weights=weights,
+                        )
+                    board.put_disc(move, player)
+                    moves.append(move)
+                player = get_opposing_player(player)
+
+            write_record(file, create_record(size, size, moves))
+
+
+def get_samples(records: Iterable[GameRecord], phases: int = PHASES) -> list[Sample]:
+    """
+    Get the training samples of the positions of the games, each also with the colors
+    of the discs swapped.
+
+    Args:
+        records (Iterable[GameRecord]): The games, all of the same board size.
+        phases (int): Number of game phases.
+
+    Returns:
+        list[Sample]: The samples.
+    """
+    samples = []
+    for record in records:
+        final = replay(record)
+        result = final.black.bit_count() - final.white.bit_count()
+        snapshots = [snapshot for snapshot, _, _ in iterate_positions(record)]
+
+        for snapshot in [*snapshots, final]:
+            empties = snapshot.height * snapshot.width
+            empties -= (snapshot.black | snapshot.white).bit_count()
+            phase = get_phase(empties, snapshot.height, snapshot.width, phases)
+            swapped = Snapshot(
+                snapshot.height, snapshot.width, snapshot.white, snapshot.black
+            )
+            samples.append((phase, get_indices(snapshot), result))
+            samples.append((phase, get_indices(swapped), -result))
+
+    return samples
+
+
+def fit_weights(
+    samples: list[Sample],
+    height: int,
+    width: int,
+    phases: int = PHASES,
+    epochs: int = 10,
+    rate: float = 0.1,
+    seed: int = 0,
+) -> PatternWeights:
+    """
+    Learn the weights by stochastic gradient descent.
+
+    Every step spreads the error of a sample evenly over its patterns, scaled by
+    the learning rate, so the rate does not depend on the number of patterns.
+
+    Args:
+        samples (list[Sample]): The training samples.
+        height (int): Height of the board.
+        width (int): Width of the board.
+        phases (int): Number of game phases.
+        epochs (int): Number of passes over the samples.
+        rate (float): Learning rate.
+        seed (int): Seed of the order of the samples.
+
+    Returns:
+        PatternWeights: The learned weights.
+    """
+    weights = PatternWeights(height, width, phases)
+    tables = [table.tolist() for table in weights.tables]
+    random = Random(seed)
+    samples = list(samples)
+
+    for epoch in range(epochs):
+        random.shuffle(samples)
+        squared_error = 0.0
+        for phase, indices, result in samples:
+            table = tables[phase]
+            error = result - sum(map(table.__getitem__, indices))
+            squared_error += error * error
+            step = rate * error / len(indices)
+            for index in indices:
+                table[index] += step
+        print(f"Epoch {epoch + 1}: RMSE {sqrt(squared_error / len(samples)):.3f}")
+
+    weights.tables = [array("f", values) for values in tables]
+    return weights
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Fit the pattern weights of the evaluation.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play = commands.add_parser("play", help="append self-play games to a file")
+    play.add_argument("output")
+    play.add_argument("--games", type=int, default=100)
+    play.add_argument("--seed", type=int, default=0)
+    play.add_argument("--size", type=int, default=8)
+    play.add_argument("--random-plies", type=int, default=8)
+    play.add_argument("--depth", type=int, default=2)
+    play.add_argument("--weights", help="weights evaluating the positions")
+
+    fit = commands.add_parser("fit", help="learn the weights from game records")
+    fit.add_argument("records", nargs="+")
+    fit.add_argument("--output", required=True)
+    fit.add_argument("--phases", type=int, default=PHASES)
+    fit.add_argument("--epochs", type=int, default=10)
+    fit.add_argument("--rate", type=float, default=0.1)
+    fit.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "play":
+        weights = None if args.weights is None else load_weights(args.weights)
+        play_games(
+            args.output,
+            args.games,
+            args.seed,
+            args.size,
+            args.random_plies,
+            args.depth,
+            weights,
+        )
+        print(f"{args.games} games appended to {args.output}")
+        return
+
+    records = []
+    for path in args.records:
+        with open(path, "rb") as file:
+            records.extend(read_records(file))
+    sizes = {(record.height, record.width) for record in records}
+    if len(sizes) != 1:
+        parser.error("the records must be games of one board size")
+
+    samples = get_samples(records, args.phases)
+    weights = fit_weights(
+        samples, *sizes.pop(), args.phases, args.epochs, args.rate, args.seed
+    )
+    weights.save(args.output)
+    print(f"Weights fitted on {len(samples)} positions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
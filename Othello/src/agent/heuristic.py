@@ -1,7 +1,7 @@
 from game.board import Board
 from game.cell import Cell
 from game.position import Position
-from game.utils import neighbors
+from game.squares import get_squares
 
 
 def evaluate_board(board: Board, current_player: Cell) -> int:
@@ -17,9 +17,8 @@ def evaluate_board(board: Board, current_player: Cell) -> int:
     """
     score = 0
 
-    for row in range(board.height):
-        for col in range(board.width):
-            score += evaluate_cell(board, Position(row, col), current_player)
+    for position in get_squares(board.height, board.width).positions:
+        score += evaluate_cell(board, position, current_player)
 
     return score
 
@@ -36,18 +35,18 @@ def evaluate_cell(board: Board, position: Position, current_player: Cell) -> int
     Returns:
         int: The cell evaluation.
     """
+    squares = get_squares(board.height, board.width)
     safe_directions = 0
-    for neighbor, direction in filter(
-        lambda pos: board.is_in_bounds(pos[0]) and board.is_in_bounds(pos[1]),
-        neighbors(position.row, position.col),
-    ):
-        while board[neighbor.row][neighbor.col] == current_player:
-            neighbor = Position(
-                neighbor.row + direction.row, neighbor.col + direction.col
-            )
-            if not board.is_in_bounds(neighbor):
-                safe_directions += 1
+    for direction, ray in squares.rays[position.row * board.width + position.col]:
+        if not board.is_in_bounds(direction):
+            continue
+
+        for square in ray:
+            row, col = squares.positions[square]
+            if board[row][col] != current_player:
                 break
+        else:
+            safe_directions += 1
 
     return safe_directions
 
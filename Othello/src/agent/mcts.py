@@ -0,0 +1,324 @@
+"""
+Monte Carlo tree search agent, an alternative to the alpha-beta search of `agent.core`
+which needs no evaluation function: moves are judged by the results of random games
+played from them, which are spread across a pool of processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from math import log, sqrt
+from random import Random
+from time import monotonic
+
+from game.bitboard import Geometry, from_flat, get_flips, get_geometry, get_moves
+from game.board import Board
+from game.cell import Cell
+from game.position import Position
+from game.utils import get_opposing_player, iterate_bits
+
+EXPLORATION = sqrt(2)
+"""
+Default weight of the exploration term of UCT.
+"""
+
+PLAYOUTS = 8
+"""
+Default number of random games played from every expanded node.
+"""
+
+
+def playout(own: int, opponent: int, geometry: Geometry, random: Random) -> int:
+    """
+    Play random moves until the end of the game.
+
+    Args:
+        own (int): Discs of the player to move, in the bit layout of the geometry.
+        opponent (int): Discs of its opponent.
+        geometry (Geometry): The bit layout.
+        random (Random): Source of the random moves.
+
+    Returns:
+        int: Final disc differential for the player to move.
+    """
+    sign = 1
+    passed = False
+    while True:
+        moves = get_moves(own, opponent, geometry)
+        if not moves:
+            if passed:
+                break
+            passed = True
+        else:
+            passed = False
+            move = 1 << random.choice(list(iterate_bits(moves)))
+            flips = get_flips(own, opponent, move, geometry)
+            own, opponent = own | move | flips, opponent & ~flips
+
+        own, opponent = opponent, own
+        sign = -sign
+
+    return sign * (own.bit_count() - opponent.bit_count())
+
+
+def _run_playouts(
+    height: int, width: int, own: int, opponent: int, count: int, seed: int
+) -> tuple[int, int]:
+    """
+    Play random games from a position.
+
+    Returns:
+        tuple[int, int]: Number of the games won and drawn by the player to move.
+    """
+    geometry = get_geometry(height, width)
+    random = Random(seed)
+    wins = draws = 0
+    for _ in range(count):
+        result = playout(own, opponent, geometry, random)
+        wins += result > 0
+        draws += result == 0
+    return wins, draws
+
+
+class Node:
+    """
+    Position in the search tree.
+    """
+
+    __slots__ = (
+        "own",
+        "opponent",
+        "player",
+        "move",
+        "parent",
+        "children",
+        "untried",
+        "visits",
+        "reward",
+    )
+
+    def __init__(
+        self,
+        own: int,
+        opponent: int,
+        player: Cell,
+        geometry: Geometry,
+        move: int | None = None,
+        parent: "Node | None" = None,
+    ) -> None:
+        """
+        Initialize the node.
+
+        Args:
+            own (int): Discs of the player to move.
+            opponent (int): Discs of its opponent.
+            player (Cell): The player to move.
+            geometry (Geometry): The bit layout of the discs.
+            move (int | None): Bit index of the move leading to the node, None for
+                the root and for a pass.
+            parent (Node | None): The node of the previous position.
+        """
+        self.own = own
+        self.opponent = opponent
+        self.player = player
+        self.move = move
+        self.parent = parent
+        self.children: list[Node] = []
+        self.visits = 0
+        self.reward = 0.0
+        """
+        Sum of the results of the games played through the node for the player who
+        moved to it: 1 for a win, 0.5 for a draw.
+        """
+
+        moves = get_moves(own, opponent, geometry)
+        self.untried: list[int | None] = list(iterate_bits(moves))
+        """
+        Moves not expanded yet, None being a pass when there is no move but the game
+        is not over.
+        """
+        if not moves and get_moves(opponent, own, geometry):
+            self.untried.append(None)
+
+    def select(self, exploration: float) -> "Node":
+        """
+        Get the child with the highest upper confidence bound.
+        """
+        log_visits = log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.reward / child.visits
+            + exploration * sqrt(log_visits / child.visits),
+        )
+
+    def expand(self, move: int | None, geometry: Geometry) -> "Node":
+        """
+        Add the child after the given untried move.
+        """
+        self.untried.remove(move)
+        if move is None:
+            own, opponent = self.own, self.opponent
+        else:
+            bit = 1 << move
+            flips = get_flips(self.own, self.opponent, bit, geometry)
+            own, opponent = self.own | bit | flips, self.opponent & ~flips
+
+        player = get_opposing_player(self.player)
+        child = Node(opponent, own, player, geometry, move, self)
+        self.children.append(child)
+        return child
+
+
+class MonteCarloSearch:
+    """
+    Monte Carlo tree search with the UCT selection, for one player through a game.
+
+    The tree of the previous move is kept, and the subtree of the current position is
+    reused if it is reached from it. With more than one worker, several nodes are
+    expanded at once and their random games are played in a pool of processes; their
+    visits are counted before the results come, so that they are not selected again.
+    """
+
+    def __init__(
+        self,
+        exploration: float = EXPLORATION,
+        playouts: int = PLAYOUTS,
+        workers: int = 1,
+        seed: int | None = None,
+    ) -> None:
+        """
+        Initialize the search.
+
+        Args:
+            exploration (float): Weight of the exploration term of UCT.
+            playouts (int): Number of random games played from every expanded node.
+            workers (int): Number of processes playing the random games, they are
+                played in this process if 1.
+            seed (int | None): Seed of the random moves.
+        """
+        self.exploration = exploration
+        self.playouts = playouts
+        self.workers = workers
+        self.random = Random(seed)
+        self.root: Node | None = None
+        self._pool: ProcessPoolExecutor | None = None
+
+    def close(self) -> None:
+        """
+        Shut the pool of processes down.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def pick_move(
+        self,
+        board: Board,
+        player: Cell,
+        time_limit: float | None = None,
+        iterations: int = 1000,
+    ) -> Position:
+        """
+        Pick the move of the player with the most visits.
+
+        There MUST be at least one valid move for the player.
+
+        Args:
+            board (Board): The game board.
+            player (Cell): The player who is making the move.
+            time_limit (float | None): Time budget of the search in seconds, which
+                replaces the number of iterations if given.
+            iterations (int): Number of nodes to expand, at least one batch of
+                `workers` nodes is expanded whatever the budget.
+
+        Returns:
+            Position: The best move.
+        """
+        geometry = get_geometry(board.height, board.width)
+        root = self._find_root(board, player, geometry)
+        deadline = None if time_limit is None else monotonic() + time_limit
+
+        expanded = 0
+        while True:
+            # At least one batch, so that the root has a child even without a budget
+            leaves = [self._descend(root, geometry) for _ in range(self.workers)]
+            results = self._play(leaves, geometry)
+            for leaf, (wins, draws) in zip(leaves, results):
+                self._backpropagate(leaf, wins, draws)
+            expanded += len(leaves)
+            if deadline is None and expanded >= iterations:
+                break
+            if deadline is not None and monotonic() >= deadline:
+                break
+
+        best = max(root.children, key=lambda child: child.visits)
+        best.parent = None
+        self.root = best
+        assert best.move is not None, "The player has no valid move"
+        return geometry.positions[best.move]
+
+    def _find_root(self, board: Board, player: Cell, geometry: Geometry) -> Node:
+        """
+        Find the node of the current position among the nodes reached from the root of
+        the previous move in one or two plies, or create a new tree.
+        """
+        snapshot = board.snapshot()
+        black = from_flat(snapshot.black, geometry)
+        white = from_flat(snapshot.white, geometry)
+        own, opponent = (black, white) if player == Cell.BLACK else (white, black)
+
+        candidates = [] if self.root is None else [self.root]
+        for _ in range(2):
+            for node in candidates:
+                if (node.own, node.opponent, node.player) == (own, opponent, player):
+                    node.parent = None
+                    return node
+            candidates = [child for node in candidates for child in node.children]
+
+        return Node(own, opponent, player, geometry)
+
+    def _descend(self, root: Node, geometry: Geometry) -> Node:
+        """
+        Select the nodes down from the root and expand one of their untried moves,
+        counting the visits of the random games to be played from it.
+        """
+        node = root
+        while not node.untried and node.children:
+            node = node.select(self.exploration)
+        if node.untried:
+            node = node.expand(self.random.choice(node.untried), geometry)
+
+        visited: Node | None = node
+        while visited is not None:
+            visited.visits += self.playouts
+            visited = visited.parent
+        return node
+
+    def _play(self, leaves: list[Node], geometry: Geometry) -> list[tuple[int, int]]:
+        arguments = [
+            (
+                geometry.height,
+                geometry.width,
+                leaf.own,
+                leaf.opponent,
+                self.playouts,
+                self.random.getrandbits(64),
+            )
+            for leaf in leaves
+        ]
+        if self.workers <= 1:
+            return [_run_playouts(*argument) for argument in arguments]
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        futures = [
+            self._pool.submit(_run_playouts, *argument) for argument in arguments
+        ]
+        return [future.result() for future in futures]
+
+    def _backpropagate(self, leaf: Node, wins: int, draws: int) -> None:
+        losses = self.playouts - wins - draws
+        node: Node | None = leaf
+        while node is not None:
+            # The reward is for the player who moved to the node, not the one to move.
+            won = losses if node.player == leaf.player else wins
+            node.reward += won + draws / 2
+            node = node.parent
@@ -0,0 +1,307 @@
+from concurrent.futures import FIRST_EXCEPTION, Future, ProcessPoolExecutor, wait
+from itertools import count
+from multiprocessing import Array
+from multiprocessing.sharedctypes import SynchronizedArray
+from threading import Event, Lock
+from time import monotonic
+
+from agent.patterns import PatternWeights
+from agent.search import TABLE, Search
+from agent.stats import SearchStats
+from agent.transposition import TranspositionTable
+from agent.utils import INFINITY, SearchTimeout
+from game.bitboard import BitBoard
+from game.board import Board, Snapshot
+from game.cell import Cell
+from game.core import get_valid_moves
+from game.position import Position
+from game.utils import get_opposing_player
+
+SLOTS = 16
+"""
+Number of root searches which can run at the same time on one pool.
+"""
+
+POLL_INTERVAL = 0.005
+"""
+Seconds between two checks of the deadline and the stop event while waiting for
+the workers.
+"""
+
+_pools: dict[int, "_Pool"] = {}
+"""
+Process pools by their number of workers.
+"""
+
+_search_ids = count(1)
+"""
+Ids of the root searches, never reused so that a slot is not mistaken for the search
+which used it before.
+"""
+
+_shared_slots: SynchronizedArray | None = None
+"""
+The slots of the pool, set in every worker process.
+"""
+
+
+class _Pool:
+    """
+    Process pool with the slots shared by its workers: every running root search owns
+    a slot holding its id and the best score found so far for it, the alpha bound of
+    the moves started next. A search frees its slot when it returns or is stopped, which
+    stops its moves still being searched.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.slots = Array("q", 2 * SLOTS)
+        self.executor = ProcessPoolExecutor(
+            workers, initializer=_initialize_worker, initargs=(self.slots,)
+        )
+        self._free = list(range(SLOTS))
+        self._lock = Lock()
+
+    def acquire(self, alpha: int) -> tuple[int, int]:
+        """
+        Take a free slot for a new search starting from the given alpha bound.
+
+        Returns:
+            tuple[int, int]: The slot and the id of the search.
+
+        Raises:
+            RuntimeError: If all slots are taken.
+        """
+        with self._lock:
+            if not self._free:
+                raise RuntimeError(f"More than {SLOTS} parallel searches at once")
+            slot = self._free.pop()
+        search_id = next(_search_ids)
+        with self.slots.get_lock():
+            self.slots[2 * slot] = search_id
+            self.slots[2 * slot + 1] = alpha
+        return slot, search_id
+
+    def release(self, slot: int) -> None:
+        """
+        Free the slot of a search, stopping its workers.
+        """
+        with self.slots.get_lock():
+            self.slots[2 * slot] = 0
+        with self._lock:
+            self._free.append(slot)
+
+
+class _SlotStop:
+    """
+    Stop flag of a worker search, set once its root search freed its slot.
+    """
+
+    def __init__(self, slots: SynchronizedArray, slot: int, search_id: int) -> None:
+        self._values = slots.get_obj()
+        self._index = 2 * slot
+        self._search_id = search_id
+
+    def is_set(self) -> bool:
+        return self._values[self._index] != self._search_id
+
+
+def _initialize_worker(shared_slots: SynchronizedArray) -> None:
+    global _shared_slots
+    _shared_slots = shared_slots
+
+
+def _get_pool(workers: int) -> _Pool:
+    if workers not in _pools:
+        _pools[workers] = _Pool(workers)
+    return _pools[workers]
+
+
+def _search_move(
+    snapshot: Snapshot,
+    player: Cell,
+    move: Position,
+    depth: int,
+    beta: int,
+    deadline: float | None,
+    slot: int,
+    search_id: int,
+    profile: bool,
+    weights: PatternWeights | None,
+) -> tuple[int, bool, SearchStats]:
+    """
+    Search a single root move in a worker process.
+
+    The search starts from the best score found by all workers so far and publishes its
+    score if it improves on it, both in the slot of its root search. It stops at
+    the deadline, an absolute `time.monotonic()` time shared by the processes, or when
+    the root search frees its slot.
+
+    Returns:
+        tuple[int, bool, SearchStats]: The score of the move, whether it is exact and
+            the statistics of the search. Scores that are not exact are only an upper bound,
+            below the best score of another move.
+
+    Raises:
+        SearchTimeout: If the deadline has passed or the root search is over.
+    """
+    assert _shared_slots is not None
+
+    stop = _SlotStop(_shared_slots, slot, search_id)
+    with _shared_slots.get_lock():
+        if stop.is_set():
+            raise SearchTimeout()
+        alpha = _shared_slots[2 * slot + 1]
+
+    board = BitBoard.from_snapshot(snapshot)
+    opponent = get_opposing_player(player)
+    stats = SearchStats(profile=profile)
+    search = Search(board, opponent, TABLE, deadline, stats, stop, weights)
+
+    board.put_disc(move, player)
+    score = -search.alpha_beta(opponent, depth - 1, -beta, -alpha)
+
+    if score > alpha:
+        with _shared_slots.get_lock():
+            if not stop.is_set() and score > _shared_slots[2 * slot + 1]:
+                _shared_slots[2 * slot + 1] = score
+    return score, score > alpha, search.stats
+
+
+class ParallelSearch:
+    """
+    Root search which splits the moves of the player across a pool of processes.
+
+    Every worker receives a snapshot of the board and searches one root move with its
+    own transposition table. The best score found so far is shared by the workers of
+    the search, in its own slot of the pool, as the alpha bound of the moves they start
+    next. With young brothers wait, the first
+    move is searched locally before the others are split, so that all of them start with
+    its score as the bound.
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        player: Cell,
+        table: TranspositionTable,
+        deadline: float | None = None,
+        workers: int = 2,
+        young_brothers_wait: bool = True,
+        stats: SearchStats | None = None,
+        stop: Event | None = None,
+        weights: PatternWeights | None = None,
+    ) -> None:
+        """
+        Initialize the search.
+
+        Args:
+            board (Board): The game board.
+            player (Cell): The player who is making the move.
+            table (TranspositionTable): The transposition table of the local search.
+            deadline (float | None): The `time.monotonic()` time when the search is stopped
+                by raising `SearchTimeout`, or None if the time is not limited.
+            workers (int): Number of worker processes.
+            young_brothers_wait (bool): Whether to search the first move before the others.
+            stats (SearchStats | None): Statistics to count the local search and
+                the finished worker searches in, new ones if not given.
+            stop (Event | None): Event which stops the search like the deadline when it
+                is set, the workers included.
+            weights (PatternWeights | None): Pattern weights evaluating the leaves,
+                sent to the workers.
+        """
+        self.board = board
+        self.player = player
+        self.deadline = deadline
+        self.young_brothers_wait = young_brothers_wait
+        self.pool = _get_pool(workers)
+        self.stop = stop
+        self.weights = weights
+        self.local = Search(board, player, table, deadline, stats, stop, weights)
+        self.stats = self.local.stats
+
+    @property
+    def nodes(self) -> int:
+        """
+        Number of nodes visited by the local search and the finished worker searches.
+        """
+        return self.stats.nodes
+
+    def search_root(
+        self,
+        depth: int,
+        first_move: Position | None = None,
+        alpha: int = -INFINITY,
+        beta: int = INFINITY,
+    ) -> tuple[Position, int]:
+        """
+        Search all moves of the player to the given depth, see `Search.search_root`.
+        """
+        moves = list(get_valid_moves(self.board, self.player))
+        if first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+
+        best_move = moves[0]
+        best_score = -INFINITY
+        if self.young_brothers_wait:
+            opponent = get_opposing_player(self.player)
+            self.board.put_disc(best_move, self.player)
+            best_score = -self.local.alpha_beta(opponent, depth - 1, -beta, -alpha)
+            self.board.undo()
+            moves = moves[1:]
+            if best_score >= beta:
+                return best_move, best_score
+
+        slot, search_id = self.pool.acquire(max(alpha, best_score))
+        snapshot = self.board.snapshot()
+        futures: list[Future] = []
+        try:
+            futures = [
+                self.pool.executor.submit(
+                    _search_move,
+                    snapshot,
+                    self.player,
+                    move,
+                    depth,
+                    beta,
+                    self.deadline,
+                    slot,
+                    search_id,
+                    self.stats.profile,
+                    self.weights,
+                )
+                for move in moves
+            ]
+            results = self._wait(futures)
+        finally:
+            self.pool.release(slot)
+            for future in futures:
+                future.cancel()
+
+        for move, (score, exact, stats) in zip(moves, results):
+            self.stats.merge(stats)
+            if exact and score > best_score:
+                best_score = score
+                best_move = move
+
+        return best_move, best_score
+
+    def _wait(self, futures: list[Future]) -> list[tuple[int, bool, SearchStats]]:
+        """
+        Wait for the results of the workers, checking the deadline and the stop event.
+
+        Raises:
+            SearchTimeout: If a worker timed out, the deadline has passed or the search
+                was stopped.
+        """
+        timeout = None if self.deadline is None and self.stop is None else POLL_INTERVAL
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout, return_when=FIRST_EXCEPTION)
+            for future in done:
+                future.result()
+            if self.deadline is not None and monotonic() > self.deadline:
+                raise SearchTimeout()
+            if self.stop is not None and self.stop.is_set():
+                raise SearchTimeout()
+        return [future.result() for future in futures]
@@ -0,0 +1,317 @@
+"""
+Evaluation of the board by patterns: groups of squares along the edges, the corners and
+the diagonals. The contents of every pattern are encoded as a ternary index, each square
+being a digit, 0 for empty, 1 for black and 2 for white, into a table of weights learned
+from played games, see `agent.fitting`. The evaluation of a position is the sum of
+the weights of its patterns, an estimate of the final disc differential for black.
+
+Patterns of the same shape share a table, and every game phase, by the number of empty
+squares, has its own tables. The weights file starts with a header followed by
+the tables of every phase as 32-bit floats, in the order of `get_pattern_groups`.
+"""
+
+import os
+import struct
+from array import array
+from collections import namedtuple
+from functools import cache
+
+from agent.evaluator import BoardFollower
+from game.board import Board, Snapshot
+from game.cell import Cell
+from game.position import Position
+from game.squares import get_squares
+
+MAGIC = b"OTHP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHH")
+"""
+Magic, version, height, width and number of phases.
+"""
+
+PHASES = 4
+"""
+Default number of game phases with their own weights.
+"""
+
+MAX_PATTERN_LENGTH = 10
+"""
+Maximal number of squares of a pattern, whose table has 3 to the power of it weights.
+"""
+
+EDGE_SEGMENT = 8
+"""
+Number of squares of the two patterns from the corners along edges too long to be
+a single pattern.
+"""
+
+MIN_DIAGONAL = 4
+"""
+Minimal length of the diagonals used as patterns.
+"""
+
+DIGITS = {Cell.EMPTY: 0, Cell.BLACK: 1, Cell.WHITE: 2}
+
+PatternGroup = namedtuple("PatternGroup", ["name", "instances"])
+"""
+Patterns of the same shape sharing a table: its name and the squares of every pattern,
+ordered from the least significant digit of the index.
+"""
+
+
+@cache
+def get_pattern_groups(height: int, width: int) -> tuple[PatternGroup, ...]:
+    """
+    Get the patterns of a board of the given size.
+
+    Args:
+        height (int): Height of the board.
+        width (int): Width of the board.
+
+    Returns:
+        tuple[PatternGroup, ...]: The groups of patterns of the same shape.
+    """
+    groups: dict[str, list[tuple[Position, ...]]] = {}
+    corners = [(0, 0, 1, 1), (0, width - 1, 1, -1)]
+    corners += [(height - 1, 0, -1, 1), (height - 1, width - 1, -1, -1)]
+
+    for row, col, row_dir, col_dir in corners:
+        groups.setdefault("corner", []).append(
+            tuple(
+                Position(row + row_dir * i, col + col_dir * j)
+                for i in range(3)
+                for j in range(3)
+            )
+        )
+
+    edges = [[Position(0, col) for col in range(width)]]
+    edges.append([Position(height - 1, col) for col in range(width)])
+    edges.append([Position(row, 0) for row in range(height)])
+    edges.append([Position(row, width - 1) for row in range(height)])
+    for edge in edges:
+        if len(edge) <= MAX_PATTERN_LENGTH:
+            groups.setdefault(f"edge{len(edge)}", []).append(tuple(edge))
+        else:
+            name = f"edge{EDGE_SEGMENT}"
+            groups.setdefault(name, []).append(tuple(edge[:EDGE_SEGMENT]))
+            groups.setdefault(name, []).append(tuple(edge[::-1][:EDGE_SEGMENT]))
+
+    for col_dir in (1, -1):
+        starts = [Position(0, col) for col in range(width)]
+        starts += [
+            Position(row, 0 if col_dir == 1 else width - 1) for row in range(1, height)
+        ]
+        for start in starts:
+            diagonal = []
+            position = start
+            while 0 <= position.row < height and 0 <= position.col < width:
+                diagonal.append(position)
+                position = Position(position.row + 1, position.col + col_dir)
+            if MIN_DIAGONAL <= len(diagonal) <= MAX_PATTERN_LENGTH:
+                groups.setdefault(f"diagonal{len(diagonal)}", []).append(
+                    tuple(diagonal)
+                )
+
+    return tuple(
+        PatternGroup(name, tuple(instances)) for name, instances in groups.items()
+    )
+
+
+@cache
+def get_offsets(height: int, width: int) -> tuple[int, ...]:
+    """
+    Get the offsets of the tables of the pattern groups in the weights of a phase,
+    followed by their total size.
+    """
+    offsets = [0]
+    for group in get_pattern_groups(height, width):
+        offsets.append(offsets[-1] + 3 ** len(group.instances[0]))
+    return tuple(offsets)
+
+
+def get_phase(empties: int, height: int, width: int, phases: int) -> int:
+    """
+    Get the game phase of a position by its number of empty squares.
+    """
+    total = height * width - 4
+    return min(phases - 1, (total - empties) * phases // total)
+
+
+def get_indices(snapshot: Snapshot) -> list[int]:
+    """
+    Get the index of every pattern of the board into the weights of a phase, i.e.
+    the ternary index of the pattern plus the offset of its table.
+
+    Args:
+        snapshot (Snapshot): The board.
+
+    Returns:
+        list[int]: The indices, in the order of the groups and of their patterns.
+    """
+    height, width = snapshot.height, snapshot.width
+    offsets = get_offsets(height, width)
+    indices = []
+    for group, offset in zip(get_pattern_groups(height, width), offsets):
+        for squares in group.instances:
+            index = 0
+            for row, col in reversed(squares):
+                square = row * width + col
+                digit = (snapshot.black >> square & 1) + 2 * (
+                    snapshot.white >> square & 1
+                )
+                index = index * 3 + digit
+            indices.append(offset + index)
+    return indices
+
+
+class PatternWeights:
+    """
+    Weight tables of the patterns of a board size, one array per phase.
+
+    Weights loaded from a file are pickled as their path, so that they are sent cheaply
+    to the processes of a pool, which load them once.
+    """
+
+    def __init__(self, height: int, width: int, phases: int = PHASES) -> None:
+        """
+        Initialize the weights to zero.
+
+        Args:
+            height (int): Height of the board.
+            width (int): Width of the board.
+            phases (int): Number of game phases.
+        """
+        self.height = height
+        self.width = width
+        self.phases = phases
+        size = get_offsets(height, width)[-1]
+        self.tables = [array("f", bytes(4 * size)) for _ in range(phases)]
+        self.path: str | None = None
+        """
+        Path of the file the weights were loaded from, if any.
+        """
+
+    def __reduce__(self) -> str | tuple:
+        if self.path is None:
+            return super().__reduce__()
+        return load_weights, (self.path,)
+
+    def save(self, path: str) -> None:
+        """
+        Write the weights to a file, creating its directory if needed.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(
+                HEADER.pack(MAGIC, VERSION, self.height, self.width, self.phases)
+            )
+            for table in self.tables:
+                file.write(table.tobytes())
+
+
+@cache
+def load_weights(path: str) -> PatternWeights:
+    """
+    Load the weights from a file, once per process.
+
+    Raises:
+        ValueError: If the file does not contain weights.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a weights file")
+    magic, version, height, width, phases = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a weights file")
+    size = get_offsets(height, width)[-1] * 4
+    if len(data) != HEADER.size + phases * size:
+        raise ValueError(f"{path} is truncated")
+
+    weights = PatternWeights(height, width, phases)
+    weights.tables = [
+        array("f", data[start : start + size])
+        for start in range(HEADER.size, len(data), size)
+    ]
+    weights.path = path
+    return weights
+
+
+class PatternEvaluator(BoardFollower):
+    """
+    Evaluation of the board by pattern weights, kept up to date with the moves made on
+    the board and undone: a move only adds to the indices of the patterns through
+    the changed squares, and an evaluation is one table lookup per pattern.
+    """
+
+    def __init__(self, board: Board, weights: PatternWeights) -> None:
+        """
+        Initialize the evaluator with the current position of the board.
+
+        Args:
+            board (Board): The game board.
+            weights (PatternWeights): Weights of the size of the board.
+        """
+        assert (weights.height, weights.width) == (board.height, board.width)
+        self.weights = weights
+        self.square_patterns: dict[Position, list[tuple[int, int]]] = {
+            position: []
+            for position in get_squares(board.height, board.width).positions
+        }
+        """
+        The patterns through every square, with the value of its digit.
+        """
+        pattern = 0
+        for group in get_pattern_groups(board.height, board.width):
+            for squares in group.instances:
+                for digit, position in enumerate(squares):
+                    self.square_patterns[position].append((pattern, 3**digit))
+                pattern += 1
+        super().__init__(board)
+
+    def evaluate(self, current_player: Cell) -> int:
+        """
+        Evaluate the board for the current player.
+
+        Args:
+            current_player (Cell): The player who is making the move.
+
+        Returns:
+            int: The estimated final disc differential for the player.
+        """
+        self.sync()
+        weights, board = self.weights, self.board
+        phase = get_phase(self.empties, board.height, board.width, weights.phases)
+        score = round(sum(map(weights.tables[phase].__getitem__, self.indices)))
+        return score if current_player == Cell.BLACK else -score
+
+    def _reset(self) -> None:
+        self.indices = get_indices(self.board.snapshot())
+        self.empties = self.board.count_discs(Cell.EMPTY)
+
+    def _apply(
+        self, position: Position, outflanked_discs: list[Position]
+    ) -> list[tuple[int, int]]:
+        # Black adds a digit 1 and turns 2 into 1, white adds a 2 and turns 1 into 2
+        placed = DIGITS[self.board.get_cell(position)]
+        flipped = 2 * placed - 3
+
+        changes = [
+            (pattern, placed * value)
+            for pattern, value in self.square_patterns[position]
+        ]
+        for disc in outflanked_discs:
+            changes += [
+                (pattern, flipped * value)
+                for pattern, value in self.square_patterns[disc]
+            ]
+        for pattern, delta in changes:
+            self.indices[pattern] += delta
+        self.empties -= 1
+        return changes
+
+    def _revert(self, changes: list[tuple[int, int]]) -> None:
+        for pattern, delta in changes:
+            self.indices[pattern] -= delta
+        self.empties += 1
@@ -0,0 +1,155 @@
+from threading import Condition, Event, Thread
+
+from agent.core import search_best_turn
+from agent.utils import SearchTimeout
+from game.bitboard import BitBoard
+from game.board import Board, Snapshot
+from game.cell import Cell
+from game.core import get_valid_moves, is_game_over
+from game.position import Position
+from game.utils import get_opposing_player
+from game.zobrist import PLAYER_KEYS
+
+PREDICTION_DEPTH = 2
+"""
+Number of plies searched to predict which replies of the opponent are the most likely.
+"""
+
+
+class Ponderer:
+    """
+    Searches the answers of the bot to the predicted replies of the opponent in
+    a background thread, while the opponent is thinking.
+
+    When the opponent plays one of the replies searched so far, its answer is taken
+    without a search; otherwise the pondering is stopped and the bot searches as usual.
+    """
+
+    def __init__(self, player: Cell, predictions: int = 4, **options) -> None:
+        """
+        Initialize the ponderer.
+
+        Args:
+            player (Cell): The player played by the bot.
+            predictions (int): Maximal number of replies of the opponent to search.
+            options: Options of `search_best_turn` for the answers, typically
+                the same as of the usual moves of the bot.
+        """
+        self.player = player
+        self.predictions = predictions
+        self.options = options
+        self.position: int | None = None
+        """
+        Key of the position whose replies are pondered, None if there is none.
+        """
+        self._thread: Thread | None = None
+        self._stop = Event()
+        self._condition = Condition()
+        self._answers: dict[int, Position] = {}
+        self._current: int | None = None
+
+    def start(self, board: Board) -> None:
+        """
+        Start pondering the current position of the board, where the opponent of the bot
+        is to move, unless it is already pondered.
+
+        Args:
+            board (Board): The game board, which is not used by the background thread.
+        """
+        opponent = get_opposing_player(self.player)
+        key = board.hash ^ PLAYER_KEYS[opponent]
+        if key == self.position:
+            return
+
+        self.stop()
+        self.position = key
+        self._stop = Event()
+        self._answers = {}
+        self._thread = Thread(
+            target=self._ponder, args=(board.snapshot(), self._stop), daemon=True
+        )
+        self._thread.start()
+
+    def take(self, board: Board) -> Position | None:
+        """
+        Get the answer of the bot in the current position of the board, where the bot is
+        to move, and stop pondering. An answer which is being searched is waited for.
+
+        Args:
+            board (Board): The game board.
+
+        Returns:
+            Position | None: The answer, or None if it was not pondered.
+        """
+        key = board.hash ^ PLAYER_KEYS[self.player]
+        with self._condition:
+            self._condition.wait_for(lambda: key != self._current)
+            answer = self._answers.get(key)
+
+        self.stop()
+        if answer is not None and answer in get_valid_moves(board, self.player):
+            return answer
+        return None
+
+    def stop(self) -> None:
+        """
+        Stop pondering and wait for the background thread to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+        self.position = None
+
+    def _ponder(self, snapshot: Snapshot, stop: Event) -> None:
+        board = BitBoard.from_snapshot(snapshot)
+        opponent = get_opposing_player(self.player)
+        try:
+            for reply in self._predict(board, opponent, stop):
+                board.put_disc(reply, opponent)
+                key = board.hash ^ PLAYER_KEYS[self.player]
+                with self._condition:
+                    self._current = key
+
+                answer, score = search_best_turn(
+                    board, self.player, stop=stop, **self.options
+                )
+                board.undo()
+                if stop.is_set():
+                    return
+
+                with self._condition:
+                    if score is not None:
+                        self._answers[key] = answer
+                    self._current = None
+                    self._condition.notify_all()
+        except SearchTimeout:
+            pass
+        finally:
+            with self._condition:
+                self._current = None
+                self._condition.notify_all()
+
+    def _predict(self, board: BitBoard, opponent: Cell, stop: Event) -> list[Position]:
+        """
+        Get the most likely replies of the opponent, the best ones for it first,
+        among those after which the bot has a move.
+        """
+        scores = {}
+        for reply in get_valid_moves(board, opponent):
+            board.put_disc(reply, opponent)
+            if not is_game_over(board) and get_valid_moves(board, self.player):
+                # The same table and evaluation as the answers, whose entries it shares
+                _, score = search_best_turn(
+                    board,
+                    self.player,
+                    table=self.options.get("table"),
+                    depth=PREDICTION_DEPTH,
+                    endgame_empties=0,
+                    stop=stop,
+                    weights=self.options.get("weights"),
+                )
+                scores[reply] = score
+            board.undo()
+
+        return sorted(scores, key=scores.__getitem__)[: self.predictions]
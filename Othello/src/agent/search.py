@@ -0,0 +1,309 @@
+from time import monotonic
+
+from agent.evaluator import IncrementalEvaluator
+from agent.patterns import PatternEvaluator, PatternWeights
+from agent.stats import SearchStats
+from agent.transposition import Bound, TranspositionTable
+from agent.utils import INFINITY, SearchTimeout, StopFlag
+from game.board import Board
+from game.cell import Cell
+from game.core import get_scores, get_valid_moves, is_game_over
+from game.position import Position
+from game.utils import get_opposing_player
+from game.zobrist import PLAYER_KEYS
+
+TABLE = TranspositionTable()
+"""
+Transposition table shared by the searches that are not given their own.
+"""
+
+STATIC_ORDERING_DEPTH = 4
+"""
+Minimal remaining depth at which the moves are ordered by the evaluator, which is
+costly; below it they are ordered by the killer moves and the history heuristic.
+"""
+
+KILLER_MOVES = 2
+"""
+Number of killer moves kept per remaining depth.
+"""
+
+
+class Search:
+    """
+    Principal variation search of the moves of a player from the current position
+    of the board.
+
+    Moves that caused a cutoff are remembered as killer moves of their depth and
+    in the history heuristic, and are searched first in the positions visited later,
+    so one search should be used for all iterations of an iterative deepening.
+
+    The board is modified during the search, but every move is undone before it returns.
+    When it raises `SearchTimeout`, the moves being searched are left on the board for
+    the caller to undo, as `core.search_best_turn` does.
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        player: Cell,
+        table: TranspositionTable,
+        deadline: float | None = None,
+        stats: SearchStats | None = None,
+        stop: StopFlag | None = None,
+        weights: PatternWeights | None = None,
+    ) -> None:
+        """
+        Initialize the search.
+
+        Args:
+            board (Board): The game board.
+            player (Cell): The player who is making the move.
+            table (TranspositionTable): The transposition table to use.
+            deadline (float | None): The `time.monotonic()` time when the search is stopped
+                by raising `SearchTimeout`, or None if the time is not limited.
+            stats (SearchStats | None): Statistics to count the search in, new ones
+                if not given. If they are profiling, the phases of the search are timed.
+            stop (StopFlag | None): Flag which stops the search like the deadline when it
+                is set, e.g. from another thread.
+            weights (PatternWeights | None): Pattern weights evaluating the leaves,
+                which are scored by their disc differential if not given.
+        """
+        self.board = board
+        self.player = player
+        self.table = table
+        self.deadline = deadline
+        self.stop = stop
+        self.stats = SearchStats() if stats is None else stats
+        self.evaluator = IncrementalEvaluator(board)
+        self.patterns = None if weights is None else PatternEvaluator(board, weights)
+        self.killers: dict[int, list[Position]] = {}
+        """
+        The latest moves which caused a cutoff, by the remaining depth.
+        """
+        self.history_scores: dict[tuple[Cell, Position], int] = {}
+        """
+        Sums of the squared remaining depths at which the moves caused a cutoff.
+        """
+
+        if self.stats.profile:
+            self._get_moves = self.stats.timed("move_generation", self._get_moves)
+            self._order_moves = self.stats.timed("ordering", self._order_moves)
+            self._evaluate = self.stats.timed("evaluation", self._evaluate)
+
+    @property
+    def nodes(self) -> int:
+        """
+        Number of nodes visited by the search.
+        """
+        return self.stats.nodes
+
+    def search_root(
+        self,
+        depth: int,
+        first_move: Position | None = None,
+        alpha: int = -INFINITY,
+        beta: int = INFINITY,
+    ) -> tuple[Position, int]:
+        """
+        Search all moves of the player to the given depth.
+
+        There MUST be at least one valid move for the player.
+
+        Args:
+            depth (int): Number of plies to search, including the player's move.
+            first_move (Position | None): The move to search first, e.g. the best move
+                of a shallower search.
+            alpha (int): The lower bound of the aspiration window.
+            beta (int): The upper bound of the aspiration window.
+
+        Returns:
+            tuple[Position, int]: The best move and its score. A score outside of
+                the window is only a bound, and the move is not reliable if it is below.
+        """
+        moves = self._order_moves(
+            get_valid_moves(self.board, self.player), self.player, depth, first_move
+        )
+
+        opponent = get_opposing_player(self.player)
+        best_score = -INFINITY
+        best_move = moves[0][0]
+        for index, (move, outflanked_discs) in enumerate(moves):
+            self.board.put_disc(move, self.player, outflanked_discs)
+            score = self._search_child(
+                opponent, depth - 1, max(alpha, best_score), beta, index == 0
+            )
+            self.board.undo()
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if best_score >= beta:
+                break
+
+        return best_move, best_score
+
+    def alpha_beta(
+        self, current_player: Cell, depth: int, alpha: int, beta: int
+    ) -> int:
+        """
+        Alpha-beta pruning algorithm in the negamax form.
+
+        Args:
+            current_player (Cell): The player who is making the move.
+            depth (int): The depth of the search tree.
+            alpha (int): The alpha value.
+            beta (int): The beta value.
+
+        Returns:
+            int: The best score for the current player.
+
+        Raises:
+            SearchTimeout: If the deadline of the search has passed or it was stopped.
+        """
+        stats = self.stats
+        stats.nodes += 1
+        if self.deadline is not None and monotonic() > self.deadline:
+            raise SearchTimeout()
+        if self.stop is not None and self.stop.is_set():
+            raise SearchTimeout()
+
+        board = self.board
+        opponent = get_opposing_player(current_player)
+
+        if self.patterns is not None:
+            self.patterns.sync()
+        game_over = is_game_over(board)
+        if depth == 0 or game_over:
+            stats.leaves += 1
+            return self._evaluate(current_player, game_over)
+
+        moves = self._get_moves(current_player)
+        if not moves:
+            return -self.alpha_beta(opponent, depth - 1, -beta, -alpha)
+
+        key = board.hash ^ PLAYER_KEYS[current_player]
+        entry = self.table.lookup(key)
+        best_move = None
+        if entry is not None:
+            stats.table_hits += 1
+            if entry.depth >= depth:
+                if entry.bound == Bound.EXACT:
+                    stats.table_cutoffs += 1
+                    return entry.value
+                if entry.bound == Bound.LOWER:
+                    alpha = max(alpha, entry.value)
+                else:
+                    beta = min(beta, entry.value)
+                if alpha >= beta:
+                    stats.table_cutoffs += 1
+                    return entry.value
+            best_move = entry.move
+
+        original_alpha = alpha
+        value = -INFINITY
+        for index, (move, outflanked_discs) in enumerate(
+            self._order_moves(moves, current_player, depth, best_move)
+        ):
+            board.put_disc(move, current_player, outflanked_discs)
+            score = self._search_child(opponent, depth - 1, alpha, beta, index == 0)
+            board.undo()
+            if score > value:
+                value = score
+                best_move = move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                stats.cutoffs += 1
+                if index == 0:
+                    stats.first_move_cutoffs += 1
+                self._add_cutoff(current_player, depth, move)
+                break
+
+        if value <= original_alpha:
+            bound = Bound.UPPER
+        elif value >= beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        self.table.store(key, depth, bound, value, best_move)
+        return value
+
+    def _get_moves(self, current_player: Cell) -> tuple[Position, ...]:
+        return get_valid_moves(self.board, current_player)
+
+    def _search_child(
+        self, current_player: Cell, depth: int, alpha: int, beta: int, first: bool
+    ) -> int:
+        """
+        Get the score of the position after a move for the player who made it, where
+        the current player is to move. The first move of a position is searched with
+        the whole window, the others with a null window proving they are not better,
+        and again with the whole window if they are.
+        """
+        if first:
+            return -self.alpha_beta(current_player, depth, -beta, -alpha)
+
+        score = -self.alpha_beta(current_player, depth, -alpha - 1, -alpha)
+        if alpha < score < beta:
+            score = -self.alpha_beta(current_player, depth, -beta, -score)
+        return score
+
+    def _add_cutoff(self, current_player: Cell, depth: int, move: Position) -> None:
+        killers = self.killers.setdefault(depth, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLER_MOVES:]
+
+        key = (current_player, move)
+        self.history_scores[key] = self.history_scores.get(key, 0) + depth * depth
+
+    def _order_moves(
+        self,
+        moves: tuple[Position, ...],
+        current_player: Cell,
+        depth: int,
+        best_move: Position | None,
+    ) -> list[tuple[Position, list[Position] | None]]:
+        """
+        Order the moves to search, the best first. Moves ordered by the evaluator come
+        with the discs they outflank, computed once to score them, to be passed to
+        `put_disc`; the others with None.
+        """
+        ordered: list[tuple[Position, list[Position] | None]]
+        if depth >= STATIC_ORDERING_DEPTH:
+            scored = self.evaluator.evaluate_moves(moves, current_player)
+            ordered = [
+                (move, outflanked_discs)
+                for (_, outflanked_discs), move in sorted(
+                    zip(scored, moves), key=lambda item: item[0][0], reverse=True
+                )
+            ]
+        else:
+            history_scores = self.history_scores
+            ordered = [
+                (move, None)
+                for move in sorted(
+                    moves,
+                    key=lambda move: -history_scores.get((current_player, move), 0),
+                )
+            ]
+            for killer in reversed(self.killers.get(depth, [])):
+                if (killer, None) in ordered:
+                    ordered.remove((killer, None))
+                    ordered.insert(0, (killer, None))
+
+        for index, (move, outflanked_discs) in enumerate(ordered):
+            if move == best_move:
+                del ordered[index]
+                ordered.insert(0, (move, outflanked_discs))
+                break
+        return ordered
+
+    def _evaluate(self, current_player: Cell, game_over: bool = False) -> int:
+        """
+        Evaluate a leaf for the current player: the disc differential if the game is
+        over, which is exact, else the estimate of the patterns if any.
+        """
+        if self.patterns is not None and not game_over:
+            return self.patterns.evaluate(current_player)
+        score = get_scores(self.board)
+        return score[current_player] - score[get_opposing_player(current_player)]
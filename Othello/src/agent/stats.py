@@ -0,0 +1,160 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TypeVar
+
+Function = TypeVar("Function", bound=Callable)
+
+PHASES = ("move_generation", "ordering", "evaluation")
+"""
+Phases of the search timed when profiling.
+"""
+
+
+@dataclass
+class SearchStats:
+    """
+    Statistics of the searches made by `pick_best_turn`, accumulated over all calls
+    they were passed to.
+    """
+
+    profile: bool = False
+    """Whether to time the phases of the search, which slows it down."""
+
+    searches: int = 0
+    """Number of searches made."""
+
+    nodes: int = 0
+    """Number of positions visited, including those of the endgame solver and workers."""
+
+    time: float = 0.0
+    """Total time of the searches in seconds."""
+
+    leaves: int = 0
+    """Number of positions evaluated at the end of the searched depth or of the game."""
+
+    cutoffs: int = 0
+    """Number of positions whose search was cut off by the beta bound."""
+
+    first_move_cutoffs: int = 0
+    """Number of cutoffs caused by the first searched move."""
+
+    table_hits: int = 0
+    """Number of positions found in the transposition table."""
+
+    table_cutoffs: int = 0
+    """Number of positions whose value was taken from the transposition table."""
+
+    depth_iterations: dict[int, int] = field(default_factory=dict)
+    """Number of completed iterations by their depth."""
+
+    depth_nodes: dict[int, int] = field(default_factory=dict)
+    """Number of nodes of the completed iterations by their depth."""
+
+    depth_times: dict[int, float] = field(default_factory=dict)
+    """Time of the completed iterations by their depth in seconds."""
+
+    phase_times: dict[str, float] = field(default_factory=dict)
+    """Time spent in the phases of the search in seconds, when profiling."""
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """
+        Share of the cutoffs caused by the first searched move, the closer to 1,
+        the better the move ordering.
+        """
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def effective_branching_factor(self) -> float:
+        """
+        Growth of the average number of nodes of an iteration per ply of depth, between
+        the shallowest and the deepest completed iterations, or from the root if all
+        of them have the same depth.
+        """
+        if not self.depth_iterations:
+            return 0.0
+
+        def average_nodes(depth: int) -> float:
+            return self.depth_nodes[depth] / self.depth_iterations[depth]
+
+        shallowest, deepest = min(self.depth_iterations), max(self.depth_iterations)
+        if shallowest == deepest:
+            return average_nodes(deepest) ** (1 / deepest)
+        ratio = average_nodes(deepest) / max(1.0, average_nodes(shallowest))
+        return ratio ** (1 / (deepest - shallowest))
+
+    def add_iteration(self, depth: int, nodes: int, time: float) -> None:
+        """
+        Record a completed iteration of the given depth.
+        """
+        self.depth_iterations[depth] = self.depth_iterations.get(depth, 0) + 1
+        self.depth_nodes[depth] = self.depth_nodes.get(depth, 0) + nodes
+        self.depth_times[depth] = self.depth_times.get(depth, 0.0) + time
+
+    def merge(self, other: "SearchStats") -> None:
+        """
+        Add the counters of other statistics to these.
+        """
+        self.searches += other.searches
+        self.nodes += other.nodes
+        self.time += other.time
+        self.leaves += other.leaves
+        self.cutoffs += other.cutoffs
+        self.first_move_cutoffs += other.first_move_cutoffs
+        self.table_hits += other.table_hits
+        self.table_cutoffs += other.table_cutoffs
+        for depth, iterations in other.depth_iterations.items():
+            self.depth_iterations[depth] = (
+                self.depth_iterations.get(depth, 0) + iterations
+            )
+        for depth, nodes in other.depth_nodes.items():
+            self.depth_nodes[depth] = self.depth_nodes.get(depth, 0) + nodes
+        for depth, time in other.depth_times.items():
+            self.depth_times[depth] = self.depth_times.get(depth, 0.0) + time
+        for phase, time in other.phase_times.items():
+            self.phase_times[phase] = self.phase_times.get(phase, 0.0) + time
+
+    def timed(self, phase: str, function: Function) -> Function:
+        """
+        Wrap the function so that the time spent in it is added to the given phase.
+
+        Args:
+            phase (str): Name of the phase.
+            function (Function): The function to time.
+
+        Returns:
+            Function: The timed function.
+        """
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.phase_times[phase] = (
+                    self.phase_times.get(phase, 0.0) + perf_counter() - start
+                )
+
+        return wrapper  # type: ignore[return-value]
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Get the statistics with the derived values, e.g. to be written as JSON.
+        """
+        return {
+            "searches": self.searches,
+            "nodes": self.nodes,
+            "time": self.time,
+            "nodes_per_second": self.nodes / self.time if self.time else 0.0,
+            "leaves": self.leaves,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "table_hits": self.table_hits,
+            "table_cutoffs": self.table_cutoffs,
+            "effective_branching_factor": self.effective_branching_factor,
+            "depth_iterations": self.depth_iterations,
+            "depth_nodes": self.depth_nodes,
+            "depth_times": self.depth_times,
+            "phase_times": self.phase_times,
+        }
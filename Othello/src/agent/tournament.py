@@ -0,0 +1,364 @@
+"""
+Round-robin tournament between variants of the agents, run from the `src` directory with
+
+    python -m agent.tournament --agent d3:depth=3 --agent d4:depth=4 \\
+        --agent patterns:depth=3,weights=../assets/patterns.bin --workers 4
+
+Every agent is a name followed by its options: `kind` (`alphabeta`, the default, or
+`mcts`), the options `depth`, `time_limit`, `weights` and `endgame_empties` of
+`search_best_turn`, and `time_limit`, `iterations`, `exploration` and `playouts` of
+`MonteCarloSearch`. Every pair of agents plays every opening twice, swapping colors.
+The openings are the most balanced positions a few plies from the start. The games are
+spread across a pool of processes, and the ratings are fitted on all of them, with
+bootstrap confidence intervals, along with the time every agent used per move.
+"""
+
+import sys
+from argparse import ArgumentParser
+from collections import namedtuple
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from math import log10
+from random import Random
+from time import perf_counter
+
+from agent.core import pick_best_turn, search_best_turn
+from agent.mcts import MonteCarloSearch
+from agent.patterns import load_weights
+from agent.transposition import TranspositionTable
+from game.bitboard import BitBoard
+from game.board import Board
+from game.cell import Cell
+from game.core import get_scores, get_valid_moves, is_game_over
+from game.position import Position
+from game.utils import get_opposing_player
+
+OPTION_TYPES: dict[str, type] = {
+    "kind": str,
+    "depth": int,
+    "time_limit": float,
+    "weights": str,
+    "endgame_empties": int,
+    "iterations": int,
+    "exploration": float,
+    "playouts": int,
+}
+
+BALANCE_DEPTH = 4
+"""
+Search depth of the scores by which the openings are chosen.
+"""
+
+BOOTSTRAP_SAMPLES = 200
+"""
+Number of resamplings of the games for the confidence intervals of the ratings.
+"""
+
+AgentSpec = namedtuple("AgentSpec", ["name", "options"])
+"""
+Name of an agent and its options, see the module.
+"""
+
+GameResult = namedtuple("GameResult", ["black", "white", "score", "times", "moves"])
+"""
+Indices of the agents, the final disc differential for black, and the time used and
+the number of moves played by black and white.
+"""
+
+
+def parse_agent(text: str) -> AgentSpec:
+    """
+    Read an agent written as `name:key=value,key=value`.
+
+    Raises:
+        ValueError: If the text is not a valid agent.
+    """
+    name, _, options_text = text.partition(":")
+    options = {}
+    for option in filter(None, options_text.split(",")):
+        key, _, value = option.partition("=")
+        if key not in OPTION_TYPES:
+            raise ValueError(f"Unknown option {key!r} of agent {name!r}")
+        options[key] = OPTION_TYPES[key](value)
+    if not name or options.get("kind", "alphabeta") not in ("alphabeta", "mcts"):
+        raise ValueError(f"Invalid agent: {text!r}")
+    return AgentSpec(name, options)
+
+
+def create_player(spec: AgentSpec, seed: int) -> Callable[[Board, Cell], Position]:
+    """
+    Create the function picking the moves of an agent through one game.
+    """
+    options = dict(spec.options)
+    if options.pop("kind", "alphabeta") == "mcts":
+        time_limit = options.pop("time_limit", None)
+        iterations = options.pop("iterations", 1000)
+        search = MonteCarloSearch(seed=seed, **options)
+        return lambda board, player: search.pick_move(
+            board, player, time_limit, iterations
+        )
+
+    if "weights" in options:
+        options["weights"] = load_weights(options["weights"])
+    table = TranspositionTable()
+    return lambda board, player: pick_best_turn(board, player, table=table, **options)
+
+
+def get_openings(count: int, plies: int = 4, size: int = 8) -> list[list[Position]]:
+    """
+    Get the most balanced openings, by the score of a shallow search of the positions
+    reached after the given number of plies.
+
+    Args:
+        count (int): Maximal number of openings.
+        plies (int): Number of moves of the openings.
+        size (int): Height and width of the board.
+
+    Returns:
+        list[list[Position]]: The moves of every opening.
+    """
+    board = BitBoard(size, size)
+    openings: dict[int, tuple[int, list[Position]]] = {}
+
+    def visit(player: Cell, moves: list[Position]) -> None:
+        valid_moves = list(get_valid_moves(board, player))
+        if len(moves) == plies:
+            if valid_moves and board.hash not in openings:
+                _, score = search_best_turn(
+                    board,
+                    player,
+                    table=TranspositionTable(),
+                    depth=BALANCE_DEPTH,
+                    endgame_empties=0,
+                )
+                openings[board.hash] = abs(score), list(moves)
+            return
+
+        for move in valid_moves:
+            board.put_disc(move, player)
+            visit(get_opposing_player(player), [*moves, move])
+            board.undo()
+
+    visit(Cell.BLACK, [])
+    return [moves for _, moves in sorted(openings.values())[:count]]
+
+
+def play_game(
+    agents: list[AgentSpec],
+    black: int,
+    white: int,
+    opening: list[Position],
+    size: int = 8,
+    seed: int = 0,
+) -> GameResult:
+    """
+    Play one game between two agents from an opening.
+
+    Args:
+        agents (list[AgentSpec]): All agents of the tournament.
+        black (int): Index of the agent playing black.
+        white (int): Index of the agent playing white.
+        opening (list[Position]): The first moves of the game.
+        size (int): Height and width of the board.
+        seed (int): Seed of the agents using randomness.
+
+    Returns:
+        GameResult: The result of the game.
+    """
+    players = {
+        Cell.BLACK: create_player(agents[black], seed),
+        Cell.WHITE: create_player(agents[white], seed),
+    }
+    times = {Cell.BLACK: 0.0, Cell.WHITE: 0.0}
+    moves = {Cell.BLACK: 0, Cell.WHITE: 0}
+
+    board = BitBoard(size, size)
+    player = Cell.BLACK
+    for move in opening:
+        board.put_disc(move, player)
+        player = get_opposing_player(player)
+
+    while not is_game_over(board):
+        if get_valid_moves(board, player):
+            start = perf_counter()
+            move = players[player](board, player)
+            times[player] += perf_counter() - start
+            moves[player] += 1
+            board.put_disc(move, player)
+        player = get_opposing_player(player)
+
+    scores = get_scores(board)
+    return GameResult(
+        black,
+        white,
+        scores[Cell.BLACK] - scores[Cell.WHITE],
+        (times[Cell.BLACK], times[Cell.WHITE]),
+        (moves[Cell.BLACK], moves[Cell.WHITE]),
+    )
+
+
+def fit_ratings(results: list[GameResult], agents: int) -> list[float]:
+    """
+    Fit the Elo ratings of the agents to the results of their games with the Bradley-Terry
+    model, a draw counting as half a win. Every pair of agents is given one virtual
+    draw, so that the ratings stay finite when an agent wins or loses all its games.
+
+    Args:
+        results (list[GameResult]): The games.
+        agents (int): Number of agents.
+
+    Returns:
+        list[float]: The rating of every agent, their mean being 0.
+    """
+    points = [0.0] * agents
+    games = [[0] * agents for _ in range(agents)]
+    for first, second in combinations(range(agents), 2):
+        games[first][second] = games[second][first] = 1
+        points[first] += 0.5
+        points[second] += 0.5
+    for result in results:
+        games[result.black][result.white] += 1
+        games[result.white][result.black] += 1
+        points[result.black] += 1.0 if result.score > 0 else 0.5 * (result.score == 0)
+        points[result.white] += 1.0 if result.score < 0 else 0.5 * (result.score == 0)
+
+    strengths = [1.0] * agents
+    for _ in range(1000):
+        updated = [
+            points[agent]
+            / sum(
+                games[agent][other] / (strengths[agent] + strengths[other])
+                for other in range(agents)
+                if other != agent
+            )
+            for agent in range(agents)
+        ]
+        done = max(abs(new - old) / old for new, old in zip(updated, strengths)) < 1e-9
+        strengths = updated
+        if done:
+            break
+
+    ratings = [400 * log10(strength) for strength in strengths]
+    mean = sum(ratings) / agents
+    return [rating - mean for rating in ratings]
+
+
+def run_tournament(
+    agents: list[AgentSpec],
+    openings: list[list[Position]],
+    size: int = 8,
+    workers: int = 1,
+    seed: int = 0,
+) -> list[GameResult]:
+    """
+    Play every opening twice between every pair of agents, swapping colors.
+
+    Args:
+        agents (list[AgentSpec]): The agents.
+        openings (list[list[Position]]): The openings.
+        size (int): Height and width of the board.
+        workers (int): Number of processes playing the games.
+        seed (int): Seed of the agents using randomness.
+
+    Returns:
+        list[GameResult]: The results, in the order in which the games finished.
+    """
+    games = [
+        (black, white, opening)
+        for first, second in combinations(range(len(agents)), 2)
+        for opening in openings
+        for black, white in ((first, second), (second, first))
+    ]
+
+    results = []
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(play_game, agents, black, white, opening, size, seed + index)
+            for index, (black, white, opening) in enumerate(games)
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+            print(
+                f"\r{len(results)}/{len(games)} games",
+                end="",
+                file=sys.stderr,
+                flush=True,
+            )
+    print(file=sys.stderr)
+    return results
+
+
+def format_report(
+    agents: list[AgentSpec], results: list[GameResult], seed: int = 0
+) -> str:
+    """
+    Write the ratings of the agents with their 95% confidence intervals, their scores
+    and their time usage as a table.
+    """
+    ratings = fit_ratings(results, len(agents))
+    random = Random(seed)
+    samples = [
+        fit_ratings(random.choices(results, k=len(results)), len(agents))
+        for _ in range(BOOTSTRAP_SAMPLES)
+    ]
+    bounds = []
+    for agent in range(len(agents)):
+        values = sorted(sample[agent] for sample in samples)
+        bounds.append(
+            (values[int(0.025 * len(values))], values[int(0.975 * len(values)) - 1])
+        )
+
+    lines = [
+        f"{'agent':<16} {'elo':>6} {'95% interval':>16} {'games':>6} {'score':>6}"
+        f" {'ms/move':>8}"
+    ]
+    for agent, spec in sorted(enumerate(agents), key=lambda item: -ratings[item[0]]):
+        games = points = time = moves = 0.0
+        for result in results:
+            for color, index, sign in ((0, result.black, 1), (1, result.white, -1)):
+                if index == agent:
+                    games += 1
+                    points += (
+                        1.0 if sign * result.score > 0 else 0.5 * (result.score == 0)
+                    )
+                    time += result.times[color]
+                    moves += result.moves[color]
+        low, high = bounds[agent]
+        lines.append(
+            f"{spec.name:<16} {ratings[agent]:>6.0f} {f'[{low:.0f}, {high:.0f}]':>16}"
+            f" {games:>6.0f} {points / games if games else 0:>6.1%}"
+            f" {1000 * time / moves if moves else 0:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Round-robin tournament of Othello agents.")
+    parser.add_argument(
+        "--agent",
+        action="append",
+        required=True,
+        help="agent as name:key=value,..., at least two",
+    )
+    parser.add_argument("--openings", type=int, default=8)
+    parser.add_argument("--opening-plies", type=int, default=4)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        agents = [parse_agent(text) for text in args.agent]
+    except ValueError as error:
+        parser.error(str(error))
+    if len(agents) < 2 or len({agent.name for agent in agents}) < len(agents):
+        parser.error("at least two agents with different names are needed")
+
+    openings = get_openings(args.openings, args.opening_plies, args.size)
+    results = run_tournament(agents, openings, args.size, args.workers, args.seed)
+    print(format_report(agents, results, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+from collections import namedtuple
+from enum import Enum, auto
+
+from game.position import Position
+
+DEFAULT_SIZE_MB = 16
+ENTRY_SIZE = 200
+"""
+Approximate number of bytes taken by one stored entry, used to turn the memory cap
+into a number of slots.
+"""
+
+
+class Bound(Enum):
+    EXACT = auto()
+    LOWER = auto()
+    UPPER = auto()
+
+
+Entry = namedtuple("Entry", ["key", "depth", "bound", "value", "move", "generation"])
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of searched positions, indexed by their Zobrist key.
+
+    Every key maps to a single slot. A stored entry is replaced by an entry of the same
+    position, by an entry searched at least as deep, or by any entry once it comes from
+    an older search, so the table never outgrows its memory cap and keeps the most
+    valuable results of the current search.
+    """
+
+    def __init__(self, size_mb: float = DEFAULT_SIZE_MB) -> None:
+        """
+        Initialize an empty table.
+
+        Args:
+            size_mb (float): Memory cap of the table in megabytes.
+        """
+        self.size = max(1, int(size_mb * 2**20) // ENTRY_SIZE)
+        self.generation = 0
+        self._entries: list[Entry | None] = [None] * self.size
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._entries)
+
+    def new_search(self) -> None:
+        """
+        Mark the start of a new search, making the entries stored so far replaceable.
+        """
+        self.generation += 1
+
+    def clear(self) -> None:
+        """
+        Remove all entries.
+        """
+        self._entries = [None] * self.size
+
+    def lookup(self, key: int) -> Entry | None:
+        """
+        Find the entry of the position with the given key.
+
+        Args:
+            key (int): The Zobrist key of the position.
+
+        Returns:
+            Entry | None: The entry, or None if the position is not stored.
+        """
+        entry = self._entries[key % self.size]
+        if entry is None or entry.key != key:
+            return None
+        return entry
+
+    def store(
+        self,
+        key: int,
+        depth: int,
+        bound: Bound,
+        value: int,
+        move: Position | None,
+    ) -> None:
+        """
+        Store the result of searching a position, unless its slot holds a more valuable one.
+
+        Args:
+            key (int): The Zobrist key of the position.
+            depth (int): The depth the position was searched to.
+            bound (Bound): Whether the value is exact or a lower or upper bound.
+            value (int): The value of the position for the player to move.
+            move (Position | None): The best move found, if any.
+        """
+        index = key % self.size
+        current = self._entries[index]
+        if (
+            current is None
+            or current.key == key
+            or current.generation != self.generation
+            or depth >= current.depth
+        ):
+            self._entries[index] = Entry(
+                key, depth, bound, value, move, self.generation
+            )
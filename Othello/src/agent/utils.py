@@ -1,8 +1,25 @@
 from random import randint
+from typing import Protocol
 
 from game.board import Board
 from game.cell import Cell
 
+INFINITY = 10**10
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its time runs out.
+    """
+
+
+class StopFlag(Protocol):
+    """
+    Flag stopping a search when it is set, such as a `threading.Event`.
+    """
+
+    def is_set(self) -> bool: ...
+
 
 def evaluate_board(board: Board, current_player: Cell) -> int:
     """
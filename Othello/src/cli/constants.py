@@ -1,4 +1,5 @@
 import curses
+import os
 
 EMPTY = "  "
 WHITE_DISC = "🔴"  # "⚪"
@@ -16,3 +17,12 @@ TOP_LEFT_EDGE_LINE = "┏"
 TOP_RIGHT_EDGE_LINE = "┓"
 BOTTOM_LEFT_EDGE_LINE = "┗"
 BOTTOM_RIGHT_EDGE_LINE = "┛"
+
+BOT_TIME_LIMIT = 0.5  # seconds
+BOT_MOVE_DELAY = 0.3  # seconds, to show the move of the bot before it is played
+OPENING_BOOK_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "assets", "opening_book.bin"
+)
+PATTERN_WEIGHTS_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "assets", "patterns.bin"
+)
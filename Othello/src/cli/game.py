@@ -1,8 +1,12 @@
 import curses
+import os
+from argparse import Namespace
 from time import sleep
 
 from agent import pick_best_turn
-from game.board import Board
+from agent.mcts import MonteCarloSearch
+from agent.ponder import Ponderer
+from game.bitboard import BitBoard
 from game.cell import Cell
 from game.core import can_play, get_scores, is_game_over
 from game.position import Position
@@ -10,18 +14,31 @@ from game.rules import is_valid_move
 from game.utils import get_opposing_player
 
 from .core import *
-from .utils import against_bot, check_terminal_size
+from .utils import (
+    check_terminal_size,
+    load_opening_book,
+    load_pattern_weights,
+    parse_arguments,
+    save_game,
+)
 
 
-def _main(stdscr: curses.window):
+def _main(stdscr: curses.window, args: Namespace):
     initialize_screen(stdscr)
 
-    plays_against_bot = against_bot()
+    plays_against_bot = args.bot is not None
+    book = load_opening_book() if args.bot == "alphabeta" else None
+    weights = load_pattern_weights() if args.bot == "alphabeta" else None
+    ponderer = Ponderer(
+        Cell.WHITE, time_limit=BOT_TIME_LIMIT, book=book, weights=weights
+    )
+    mcts = MonteCarloSearch(workers=os.cpu_count() or 1)
 
     current_player: Cell = Cell.BLACK
     cursor = Position(0, 0)
 
-    board = Board(8, 8)
+    board = BitBoard(8, 8)
+    moves: list[Position] = []
 
     while not is_game_over(board):
         while not check_terminal_size(stdscr, board):
@@ -45,23 +62,42 @@ def _main(stdscr: curses.window):
         print_board(stdscr, board, cursor, current_player)
 
         if plays_against_bot and current_player == Cell.WHITE:
-            new_cursor = pick_best_turn(board, current_player)
+            if args.bot == "mcts":
+                new_cursor = mcts.pick_move(
+                    board, current_player, time_limit=BOT_TIME_LIMIT
+                )
+            else:
+                new_cursor = ponderer.take(board) or pick_best_turn(
+                    board,
+                    current_player,
+                    time_limit=BOT_TIME_LIMIT,
+                    book=book,
+                    weights=weights,
+                )
             update_cursor(stdscr, board, new_cursor, cursor, current_player)
-            sleep(1)
+            sleep(BOT_MOVE_DELAY)
 
             cursor = new_cursor
             board.put_disc(cursor, current_player)
+            moves.append(cursor)
             current_player = get_opposing_player(current_player)
             continue
 
+        if args.bot == "alphabeta":
+            ponderer.start(board)
         key = stdscr.getch()
 
         match key:
             case 113:  # q
+                ponderer.stop()
+                mcts.close()
+                if args.record:
+                    save_game(args.record, board, moves)
                 return
             case 32 | 10:  # Space or Enter
                 if is_valid_move(board, cursor, current_player):
                     board.put_disc(cursor, current_player)
+                    moves.append(cursor)
                     current_player = get_opposing_player(current_player)
                 continue
             case curses.KEY_UP:
@@ -76,6 +112,10 @@ def _main(stdscr: curses.window):
                 continue
         cursor = update_cursor(stdscr, board, new_cursor, cursor, current_player)
 
+    ponderer.stop()
+    mcts.close()
+    if args.record:
+        save_game(args.record, board, moves)
     print_top_info(stdscr, "Game over")
     print_board(stdscr, board, cursor, current_player)
     hide_cursor(stdscr, board, cursor)
@@ -87,5 +127,5 @@ def _main(stdscr: curses.window):
     sleep(60)
 
 
-def main(against_bot: bool = False) -> None:
-    curses.wrapper(_main)
+def main() -> None:
+    curses.wrapper(_main, parse_arguments())
@@ -1,10 +1,21 @@
 import curses
-import sys
+import os
+from argparse import ArgumentParser, Namespace
 
+from agent.book import OpeningBook
+from agent.patterns import PatternWeights, load_weights
 from game.board import Board
 from game.cell import Cell
+from game.position import Position
+from game.record import create_record, write_record
 
-from .constants import BLACK_DISC, EMPTY, WHITE_DISC
+from .constants import (
+    BLACK_DISC,
+    EMPTY,
+    OPENING_BOOK_PATH,
+    PATTERN_WEIGHTS_PATH,
+    WHITE_DISC,
+)
 
 
 def check_terminal_size(stdscr: curses.window, board: Board) -> bool:
@@ -20,5 +31,42 @@ def get_cell_char(cell: Cell) -> str:
     return mapping[cell]
 
 
-def against_bot() -> bool:
-    return sys.argv[1] == "--bot" if len(sys.argv) > 1 else False
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Play Othello in the terminal.")
+    parser.add_argument(
+        "--bot",
+        nargs="?",
+        const="alphabeta",
+        choices=["alphabeta", "mcts"],
+        help="play against the bot, searching with alpha-beta (default) or MCTS",
+    )
+    parser.add_argument(
+        "--record", metavar="PATH", help="append the game to a file of game records"
+    )
+    return parser.parse_args()
+
+
+def load_opening_book() -> OpeningBook | None:
+    """
+    Open the opening book of the bot, if it was built.
+    """
+    if not os.path.exists(OPENING_BOOK_PATH):
+        return None
+    return OpeningBook(OPENING_BOOK_PATH)
+
+
+def load_pattern_weights() -> PatternWeights | None:
+    """
+    Load the pattern weights evaluating the positions of the bot, if they were fitted.
+    """
+    if not os.path.exists(PATTERN_WEIGHTS_PATH):
+        return None
+    return load_weights(PATTERN_WEIGHTS_PATH)
+
+
+def save_game(path: str, board: Board, moves: list[Position]) -> None:
+    """
+    Append the record of the game to the file, see `game.record`.
+    """
+    with open(path, "ab") as file:
+        write_record(file, create_record(board.height, board.width, moves))
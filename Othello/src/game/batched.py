@@ -0,0 +1,256 @@
+"""
+Many independent games of Othello stepped together with NumPy, e.g. to generate
+self-play data:
+
+    games = BoardBatch(1024)
+    rng = np.random.default_rng(0)
+    while not games.is_game_over().all():
+        games.step(games.random_moves(rng))
+
+Squares are numbered by their flat index `row * width + col` as in `Snapshot`,
+and -1 stands for a pass.
+"""
+
+import numpy as np
+
+from .board import Snapshot
+from .cell import Cell
+from .utils import DIRECTIONS
+
+PASS = -1
+
+
+def shift(discs: np.ndarray, row_dir: int, col_dir: int) -> np.ndarray:
+    """
+    Move every disc of the boards by one square in the given direction, dropping those
+    that leave the board.
+
+    Args:
+        discs (np.ndarray): Boolean array of shape (boards, height, width).
+        row_dir (int): Rows to move by, -1, 0 or 1.
+        col_dir (int): Columns to move by, -1, 0 or 1.
+
+    Returns:
+        np.ndarray: The moved discs.
+    """
+    _, height, width = discs.shape
+    shifted = np.zeros_like(discs)
+    shifted[
+        :,
+        max(row_dir, 0) : height + min(row_dir, 0),
+        max(col_dir, 0) : width + min(col_dir, 0),
+    ] = discs[
+        :,
+        max(-row_dir, 0) : height + min(-row_dir, 0),
+        max(-col_dir, 0) : width + min(-col_dir, 0),
+    ]
+    return shifted
+
+
+class BoardBatch:
+    """
+    Batch of games of Othello held as stacked boolean arrays, one board per game,
+    whose moves are generated and played for all games at once.
+    """
+
+    def __init__(self, size: int, height: int = 8, width: int = 8) -> None:
+        """
+        Initialize the games with the starting position, black to move.
+
+        Args:
+            size (int): Number of games.
+            height (int): Height of the boards.
+            width (int): Width of the boards.
+        """
+        self.height = height
+        self.width = width
+        self.black = np.zeros((size, height, width), dtype=bool)
+        self.white = np.zeros((size, height, width), dtype=bool)
+        self.black[:, height // 2 - 1, width // 2] = True
+        self.black[:, height // 2, width // 2 - 1] = True
+        self.white[:, height // 2 - 1, width // 2 - 1] = True
+        self.white[:, height // 2, width // 2] = True
+        self.black_to_move = np.ones(size, dtype=bool)
+        self._valid_moves: np.ndarray | None = None
+        """
+        Valid moves of the players to move, cached until the next step.
+        """
+
+    def __len__(self) -> int:
+        return len(self.black_to_move)
+
+    @classmethod
+    def from_snapshots(
+        cls, snapshots: list[Snapshot], players: list[Cell]
+    ) -> "BoardBatch":
+        """
+        Create a batch of the positions of the snapshots, all of the same size.
+
+        Args:
+            snapshots (list[Snapshot]): The boards.
+            players (list[Cell]): The player to move in each of them.
+
+        Returns:
+            BoardBatch: The new batch.
+        """
+        height, width = snapshots[0].height, snapshots[0].width
+        batch = cls(len(snapshots), height, width)
+        bits = np.arange(height * width, dtype=object)
+        for index, snapshot in enumerate(snapshots):
+            batch.black[index] = (
+                ((snapshot.black >> bits) & 1).astype(bool).reshape(height, width)
+            )
+            batch.white[index] = (
+                ((snapshot.white >> bits) & 1).astype(bool).reshape(height, width)
+            )
+        batch.black_to_move[:] = [player == Cell.BLACK for player in players]
+        batch._valid_moves = None
+        return batch
+
+    def snapshot(self, index: int) -> tuple[Snapshot, Cell]:
+        """
+        Take a snapshot of one of the games.
+
+        Args:
+            index (int): Index of the game.
+
+        Returns:
+            tuple[Snapshot, Cell]: The board and the player to move.
+        """
+        weights = 1 << np.arange(self.height * self.width, dtype=object)
+        black = int((self.black[index].ravel() * weights).sum())
+        white = int((self.white[index].ravel() * weights).sum())
+        player = Cell.BLACK if self.black_to_move[index] else Cell.WHITE
+        return Snapshot(self.height, self.width, black, white), player
+
+    def get_valid_moves(self, black: np.ndarray | None = None) -> np.ndarray:
+        """
+        Get the squares where the players can put a disc.
+
+        Args:
+            black (np.ndarray | None): Whether to get the moves of black in each game,
+                of the player to move if not given.
+
+        Returns:
+            np.ndarray: Boolean array of shape (games, height * width).
+        """
+        if black is None:
+            if self._valid_moves is None:
+                self._valid_moves = self.get_valid_moves(self.black_to_move)
+            return self._valid_moves
+
+        own, opponent = self._sides(black)
+        empty = ~(self.black | self.white)
+
+        moves = np.zeros_like(empty)
+        for row_dir, col_dir in DIRECTIONS:
+            run = shift(own, row_dir, col_dir) & opponent
+            for _ in range(max(self.height, self.width) - 3):
+                run |= shift(run, row_dir, col_dir) & opponent
+            moves |= shift(run, row_dir, col_dir) & empty
+        return moves.reshape(len(self), -1)
+
+    def get_flips(self, moves: np.ndarray) -> np.ndarray:
+        """
+        Get the discs outflanked by the moves of the players to move.
+
+        Args:
+            moves (np.ndarray): Square of the move in each game, or -1 for a pass.
+
+        Returns:
+            np.ndarray: Boolean array of shape (games, height, width).
+        """
+        own, opponent = self._sides(self.black_to_move)
+        placed = self._squares(moves)
+
+        flips = np.zeros_like(placed)
+        for row_dir, col_dir in DIRECTIONS:
+            run = shift(placed, row_dir, col_dir) & opponent
+            for _ in range(max(self.height, self.width) - 3):
+                run |= shift(run, row_dir, col_dir) & opponent
+            bounded = (shift(run, row_dir, col_dir) & own).any(axis=(1, 2))
+            flips |= run & bounded[:, None, None]
+        return flips
+
+    def get_scores(self) -> np.ndarray:
+        """
+        Count the discs of both players.
+
+        Returns:
+            np.ndarray: Array of shape (games, 2) with the numbers of black and white discs.
+        """
+        return np.stack(
+            [self.black.sum(axis=(1, 2)), self.white.sum(axis=(1, 2))], axis=1
+        )
+
+    def is_game_over(self) -> np.ndarray:
+        """
+        Check which games are over, i.e. neither player can move.
+
+        Returns:
+            np.ndarray: Boolean array of shape (games,).
+        """
+        over = ~self.get_valid_moves().any(axis=1)
+        if over.any():
+            over[over] = ~self.get_valid_moves(~self.black_to_move)[over].any(axis=1)
+        return over
+
+    def random_moves(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Pick a random valid move in every game, or a pass where there is none.
+
+        Args:
+            rng (np.random.Generator): Source of the randomness.
+
+        Returns:
+            np.ndarray: Square of the move in each game, or -1 for a pass.
+        """
+        valid = self.get_valid_moves()
+        priorities = np.where(valid, rng.random(valid.shape), -1.0)
+        return np.where(valid.any(axis=1), priorities.argmax(axis=1), PASS)
+
+    def step(self, moves: np.ndarray) -> None:
+        """
+        Play a move in every game and pass the turn to the other players. A game whose
+        player to move has no valid move must pass, as must the games which are over.
+
+        Args:
+            moves (np.ndarray): Square of the move in each game, or -1 for a pass.
+
+        Raises:
+            ValueError: If a move is not valid, or a game passes with a valid move.
+        """
+        moves = np.asarray(moves)
+        valid = self.get_valid_moves()
+        playing = moves != PASS
+        legal = valid[np.arange(len(self)), np.where(playing, moves, 0)]
+        if np.any(playing & ~legal) or np.any(~playing & valid.any(axis=1)):
+            raise ValueError("Invalid moves")
+
+        flips = self.get_flips(moves)
+        placed = self._squares(moves)
+        to_move = self.black_to_move[:, None, None]
+        changed = flips | placed
+        self.black = np.where(to_move, self.black | changed, self.black & ~flips)
+        self.white = np.where(to_move, self.white & ~flips, self.white | changed)
+        self.black_to_move = ~self.black_to_move
+        self._valid_moves = None
+
+    def _sides(self, black: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the discs of the given players and of their opponents.
+        """
+        black = black[:, None, None]
+        return (
+            np.where(black, self.black, self.white),
+            np.where(black, self.white, self.black),
+        )
+
+    def _squares(self, moves: np.ndarray) -> np.ndarray:
+        """
+        Get the boards with only the squares of the moves, empty for the passes.
+        """
+        squares = np.zeros((len(self), self.height * self.width), dtype=bool)
+        playing = np.flatnonzero(moves != PASS)
+        squares[playing, moves[playing]] = True
+        return squares.reshape(len(self), self.height, self.width)
@@ -0,0 +1,333 @@
+from collections import namedtuple
+from functools import cache
+from typing import Generator
+
+from .board import Board, Snapshot
+from .cell import Cell
+from .position import Position
+from .utils import DIRECTIONS, get_opposing_player, iterate_bits
+from .zobrist import get_zobrist_keys, hash_cells
+
+Geometry = namedtuple(
+    "Geometry", ["height", "width", "stride", "full", "shifts", "positions"]
+)
+"""
+Bit layout of a board of the given size. Square (row, col) is stored in bit
+`row * stride + col`, where `stride = width + 1` leaves one always-empty guard column
+at the end of every row, so shifting a mask horizontally never wraps into the next row.
+"""
+
+
+@cache
+def get_geometry(height: int, width: int) -> Geometry:
+    """
+    Get the (cached) bit layout of a board of the given size.
+
+    Args:
+        height (int): Height of the board.
+        width (int): Width of the board.
+
+    Returns:
+        Geometry: The bit layout.
+    """
+    stride = width + 1
+    full = 0
+    positions: list[Position | None] = [None] * (height * stride)
+    for row in range(height):
+        for col in range(width):
+            full |= 1 << (row * stride + col)
+            positions[row * stride + col] = Position(row, col)
+
+    shifts = tuple(row_dir * stride + col_dir for row_dir, col_dir in DIRECTIONS)
+    return Geometry(height, width, stride, full, shifts, tuple(positions))
+
+
+def get_moves(own: int, opponent: int, geometry: Geometry) -> int:
+    """
+    Get the mask of valid moves for the player owning the `own` discs.
+
+    Args:
+        own (int): Mask of the current player's discs.
+        opponent (int): Mask of the opponent's discs.
+        geometry (Geometry): The bit layout of the board.
+
+    Returns:
+        int: Mask of the empty squares where the current player can put a disc.
+    """
+    empty = geometry.full & ~(own | opponent)
+    moves = 0
+    for shift in geometry.shifts:
+        if shift > 0:
+            run = (own << shift) & opponent
+            while run:
+                moves |= (run << shift) & empty
+                run = (run << shift) & opponent
+        else:
+            run = (own >> -shift) & opponent
+            while run:
+                moves |= (run >> -shift) & empty
+                run = (run >> -shift) & opponent
+
+    return moves
+
+
+def get_flips(own: int, opponent: int, move: int, geometry: Geometry) -> int:
+    """
+    Get the mask of the opponent's discs outflanked by putting a disc on `move`.
+
+    Args:
+        own (int): Mask of the current player's discs.
+        opponent (int): Mask of the opponent's discs.
+        move (int): Mask with the single bit of the square where the disc is put.
+        geometry (Geometry): The bit layout of the board.
+
+    Returns:
+        int: Mask of the outflanked discs.
+    """
+    flips = 0
+    for shift in geometry.shifts:
+        run = 0
+        if shift > 0:
+            square = move << shift
+            while square & opponent:
+                run |= square
+                square <<= shift
+        else:
+            square = move >> -shift
+            while square & opponent:
+                run |= square
+                square >>= -shift
+
+        if square & own:
+            flips |= run
+
+    return flips
+
+
+def to_flat(mask: int, geometry: Geometry) -> int:
+    """
+    Convert a mask in the bit layout of the geometry to one with bit `row * width + col`
+    for square (row, col), as used by snapshots.
+    """
+    row_mask = (1 << geometry.width) - 1
+    flat = 0
+    for row in range(geometry.height):
+        flat |= ((mask >> row * geometry.stride) & row_mask) << row * geometry.width
+    return flat
+
+
+def from_flat(flat: int, geometry: Geometry) -> int:
+    """
+    Convert a mask with bit `row * width + col` for square (row, col) to the bit layout
+    of the geometry.
+    """
+    row_mask = (1 << geometry.width) - 1
+    mask = 0
+    for row in range(geometry.height):
+        mask |= ((flat >> row * geometry.width) & row_mask) << row * geometry.stride
+    return mask
+
+
+class BitBoard(Board):
+    """
+    Game board of Othello backed by two integer masks, one per player.
+
+    Behaves like `Board` (it can be indexed by rows, iterated, and its moves undone),
+    but computes valid moves and outflanked discs with shifts over whole masks.
+    """
+
+    history: list[tuple[int, int]]
+    """
+    History of the game on this board, where each element is a tuple of the bit index of
+    the square where the disc was put and the mask of the outflanked discs by result.
+    """
+
+    def __init__(self, height: int, width: int) -> None:
+        """
+        Initialize the game board with the four starting discs in the middle.
+
+        Args:
+            height (int): Height of the board.
+            width (int): Width of the board.
+        """
+        self.height = height
+        self.width = width
+        self.geometry = get_geometry(height, width)
+        self.black = 0
+        self.white = 0
+        self.history = []
+        self._rows: list[list[Cell]] | None = None
+        self._mobility: list[dict[Cell, tuple[Position, ...]]] = [{}]
+
+        self.black |= self._bit(Position(height // 2 - 1, width // 2))
+        self.black |= self._bit(Position(height // 2, width // 2 - 1))
+        self.white |= self._bit(Position(height // 2 - 1, width // 2 - 1))
+        self.white |= self._bit(Position(height // 2, width // 2))
+
+        self._keys = get_zobrist_keys(height, width)
+        self.hash = hash_cells(self.board, self._keys)
+
+    @property
+    def board(self) -> list[list[Cell]]:
+        """
+        Rows of the board as lists of cells, rebuilt from the masks after every change.
+        Modifying them does not modify the board, assign whole rows instead.
+        """
+        if self._rows is None:
+            self._rows = [
+                [
+                    self._cell(row * self.geometry.stride + col)
+                    for col in range(self.width)
+                ]
+                for row in range(self.height)
+            ]
+        return self._rows
+
+    def __setitem__(self, index: int, value: list[Cell]) -> None:
+        for col, cell in enumerate(value):
+            bit = self._bit(Position(index, col))
+            self.black &= ~bit
+            self.white &= ~bit
+            if cell == Cell.BLACK:
+                self.black |= bit
+            elif cell == Cell.WHITE:
+                self.white |= bit
+        self._discs_changed()
+
+    def snapshot(self) -> Snapshot:
+        return Snapshot(
+            self.height,
+            self.width,
+            to_flat(self.black, self.geometry),
+            to_flat(self.white, self.geometry),
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "BitBoard":
+        board = cls(snapshot.height, snapshot.width)
+        board.black = from_flat(snapshot.black, board.geometry)
+        board.white = from_flat(snapshot.white, board.geometry)
+        board._discs_changed()
+        return board
+
+    @property
+    def frontier(self) -> set[Position]:
+        """
+        Empty squares adjacent to at least one disc.
+        """
+        return {
+            self.geometry.positions[index] for index in iterate_bits(self._frontier())
+        }
+
+    def get_outflanked_discs(
+        self, position: Position, current_player: Cell
+    ) -> Generator[Position, None, None]:
+        own, opponent = self._masks(current_player)
+        flips = get_flips(own, opponent, self._bit(position), self.geometry)
+        for index in iterate_bits(flips):
+            yield self.geometry.positions[index]
+
+    def _generate_moves(self, current_player: Cell) -> Generator[Position, None, None]:
+        own, opponent = self._masks(current_player)
+        for index in iterate_bits(get_moves(own, opponent, self.geometry)):
+            yield self.geometry.positions[index]
+
+    def get_cell(self, position: Position) -> Cell:
+        return self._cell(position.row * self.geometry.stride + position.col)
+
+    def count_discs(self, cell: Cell) -> int:
+        if cell == Cell.EMPTY:
+            return self.height * self.width - (self.black | self.white).bit_count()
+        return self._masks(cell)[0].bit_count()
+
+    def put_disc(
+        self,
+        position: Position,
+        current_player: Cell,
+        outflanked_discs: list[Position] | None = None,
+    ) -> None:
+        bit = self._bit(position)
+        own, opponent = self._masks(current_player)
+        if outflanked_discs is None:
+            flips = get_flips(own, opponent, bit, self.geometry)
+        else:
+            stride = self.geometry.stride
+            flips = 0
+            for row, col in outflanked_discs:
+                flips |= 1 << (row * stride + col)
+        self._set_masks(current_player, own | bit | flips, opponent & ~flips)
+        self.history.append((bit.bit_length() - 1, flips))
+        self._mobility.append({})
+        self._update_hash(position, flips, current_player)
+
+    def get_move(self, index: int = -1) -> tuple[Position, list[Position]]:
+        square, flips = self.history[index]
+        positions = self.geometry.positions
+        return positions[square], [positions[bit] for bit in iterate_bits(flips)]
+
+    def undo(self) -> None:
+        if not self.history:
+            raise ValueError("No moves to undo")
+
+        square, flips = self.history.pop()
+        position = self.geometry.positions[square]
+        bit = 1 << square
+        player = Cell.BLACK if self.black & bit else Cell.WHITE
+        own, opponent = self._masks(player)
+        self._set_masks(player, own & ~(bit | flips), opponent | flips)
+        self._mobility.pop()
+        self._update_hash(position, flips, player)
+
+    def _discs_changed(self) -> None:
+        """
+        Drop everything derived from the masks after they were set directly.
+        """
+        self._rows = None
+        self._mobility = [{} for _ in self._mobility]
+        self.hash = hash_cells(self.board, self._keys)
+
+    def _update_hash(self, position: Position, flips: int, player: Cell) -> None:
+        own_keys = self._keys[player]
+        opponent_keys = self._keys[get_opposing_player(player)]
+        self.hash ^= own_keys[position.row][position.col]
+        for index in iterate_bits(flips):
+            row, col = self.geometry.positions[index]
+            self.hash ^= own_keys[row][col] ^ opponent_keys[row][col]
+
+    def _frontier(self) -> int:
+        occupied = self.black | self.white
+        adjacent = 0
+        for shift in self.geometry.shifts:
+            adjacent |= occupied << shift if shift > 0 else occupied >> -shift
+        return adjacent & self.geometry.full & ~occupied
+
+    def _bit(self, position: Position) -> int:
+        return 1 << (position.row * self.geometry.stride + position.col)
+
+    def _cell(self, index: int) -> Cell:
+        if self.black >> index & 1:
+            return Cell.BLACK
+        if self.white >> index & 1:
+            return Cell.WHITE
+        return Cell.EMPTY
+
+    def _masks(self, player: Cell) -> tuple[int, int]:
+        """
+        Get the masks of the given player's and the opponent's discs.
+        """
+        if player == Cell.BLACK:
+            return self.black, self.white
+        return self.white, self.black
+
+    def _set_masks(self, player: Cell, own: int, opponent: int) -> None:
+        if player == Cell.BLACK:
+            self.black, self.white = own, opponent
+        else:
+            self.white, self.black = own, opponent
+        self._rows = None
+
+
+BACKENDS: dict[str, type[Board]] = {"list": Board, "bitboard": BitBoard}
+"""
+The board implementations by name, as chosen on the command line of the tools.
+"""
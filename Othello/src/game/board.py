@@ -1,19 +1,25 @@
+from collections import namedtuple
 from typing import Generator
 
 from .cell import Cell
 from .position import Position
-from .utils import get_opposing_player, neighbors
+from .squares import get_squares
+from .utils import get_opposing_player, iterate_bits
+from .zobrist import get_zobrist_keys, hash_cells
+
+Snapshot = namedtuple("Snapshot", ["height", "width", "black", "white"])
+"""
+Compact copy of the discs on a board, which is cheap to send to another process.
+Square (row, col) is bit `row * width + col` of the mask of the player owning it.
+"""
 
 
 class Board:
     """
     Represents the game board of Othello.
-    """
 
-    history: list[tuple[Position, list[Position]]] = []
-    """
-    History of the game, where each element is a tuple of the position where the disc was put
-    and the outflanked discs by result.
+    All state of a board, including its history, belongs to the instance, so any number
+    of independent boards can be played and searched in one process (one thread each).
     """
 
     def __init__(self, height: int, width: int) -> None:
@@ -32,16 +38,83 @@ class Board:
         self.board[height // 2 - 1][width // 2] = Cell.BLACK
         self.board[height // 2][width // 2 - 1] = Cell.BLACK
 
+        self.history: list[tuple[int, int]] = []
+        """
+        History of the game on this board, where each element is a tuple of the square
+        where the disc was put, as `row * width + col`, and the mask of the outflanked
+        discs by result, with the same bits as in a `Snapshot`.
+        """
+        self._squares = get_squares(height, width)
+
+        self.frontier: set[Position] = set()
+        """
+        Empty squares adjacent to at least one disc, the only candidates for a valid move.
+        """
+        self._reset_frontier()
+
+        self._mobility: list[dict[Cell, tuple[Position, ...]]] = [{}]
+        """
+        Valid moves of the players, cached for the current position on top of the stack
+        and for every position in the history below it, so that undo restores them.
+        """
+
+        self._keys = get_zobrist_keys(height, width)
+        self.hash = hash_cells(self.board, self._keys)
+        """
+        Zobrist hash of the discs on the board, updated with every move and undo.
+        """
+
     def __getitem__(self, index: int) -> list[Cell]:
         return self.board[index]
 
     def __setitem__(self, index: int, value: list[Cell]) -> None:
         self.board[index] = value
+        self._reset_frontier()
+        self._mobility = [{} for _ in self._mobility]
+        self.hash = hash_cells(self.board, self._keys)
 
     def __iter__(self) -> Generator[list[Cell], None, None]:
         for row in self.board:
             yield row
 
+    def snapshot(self) -> Snapshot:
+        """
+        Take a compact copy of the discs on the board (without the history).
+
+        Returns:
+            Snapshot: The copy.
+        """
+        masks = {Cell.BLACK: 0, Cell.WHITE: 0, Cell.EMPTY: 0}
+        for row, cells in enumerate(self):
+            for col, cell in enumerate(cells):
+                masks[cell] |= 1 << (row * self.width + col)
+        return Snapshot(self.height, self.width, masks[Cell.BLACK], masks[Cell.WHITE])
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "Board":
+        """
+        Create a board with the discs of the given snapshot and an empty history.
+
+        Args:
+            snapshot (Snapshot): The snapshot.
+
+        Returns:
+            Board: The new board.
+        """
+        board = cls(snapshot.height, snapshot.width)
+        for row in range(snapshot.height):
+            cells = []
+            for col in range(snapshot.width):
+                bit = 1 << (row * snapshot.width + col)
+                if snapshot.black & bit:
+                    cells.append(Cell.BLACK)
+                elif snapshot.white & bit:
+                    cells.append(Cell.WHITE)
+                else:
+                    cells.append(Cell.EMPTY)
+            board[row] = cells
+        return board
+
     def get_outflanked_discs(
         self, position: Position, current_player: Cell
     ) -> Generator[Position, None, None]:
@@ -55,45 +128,97 @@ class Board:
         Returns:
             Generator[Position, None, None]: Generator of positions of the discs that will be outflanked.
         """
-        for neighbor, direction in neighbors(position.row, position.col):
-            if not self.is_in_bounds(neighbor):
-                continue
+        positions = self._squares.positions
+        cells = self.board
+        for _, ray in self._squares.rays[position.row * self.width + position.col]:
+            for length, square in enumerate(ray):
+                row, col = positions[square]
+                cell = cells[row][col]
+                if cell == Cell.EMPTY:
+                    break
+                if cell == current_player:
+                    for index in range(length):
+                        yield positions[ray[index]]
+                    break
 
-            if self[neighbor.row][neighbor.col] == current_player:
-                continue
+    def get_valid_moves(self, current_player: Cell) -> tuple[Position, ...]:
+        """
+        Get the positions where the current player can put a disc, row by row.
+        The moves are computed once per position and cached until the board changes.
 
-            opponents_discs_in_direction: list[Position] = []
+        Args:
+            current_player (Cell): The player who is making the move.
 
-            current_pos = neighbor
-            while (
-                self.is_in_bounds(current_pos)
-                and self[current_pos.row][current_pos.col] != Cell.EMPTY
-            ):
-                if self[current_pos.row][current_pos.col] == current_player:
-                    yield from opponents_discs_in_direction
-                    break
+        Returns:
+            tuple[Position, ...]: The valid moves.
+        """
+        mobility = self._mobility[-1]
+        if current_player not in mobility:
+            mobility[current_player] = tuple(self._generate_moves(current_player))
+        return mobility[current_player]
 
-                opponents_discs_in_direction.append(current_pos)
+    def _generate_moves(self, current_player: Cell) -> Generator[Position, None, None]:
+        for position in sorted(self.frontier):
+            for _ in self.get_outflanked_discs(position, current_player):
+                yield position
+                break
 
-                current_pos = Position(
-                    current_pos.row + direction.row, current_pos.col + direction.col
-                )
+    def count_discs(self, cell: Cell) -> int:
+        """
+        Count the cells of the given type on the board.
+
+        Args:
+            cell (Cell): The cell type to count.
 
-    def put_disc(self, position: Position, current_player: Cell) -> None:
+        Returns:
+            int: Number of such cells.
+        """
+        return sum(row.count(cell) for row in self)
+
+    def put_disc(
+        self,
+        position: Position,
+        current_player: Cell,
+        outflanked_discs: list[Position] | None = None,
+    ) -> None:
         """
         Put a disc at the given position and outflank the opponent's discs (does not check if the move is valid).
 
         Args:
             position (Position): The position where the disc is to be placed.
             current_player (Cell): The player who is placing the disc.
+            outflanked_discs (list[Position] | None): The discs outflanked by the move,
+                as given by `get_outflanked_discs`, if they were already computed.
         """
-        new_discs = list(self.get_outflanked_discs(position, current_player))
+        if outflanked_discs is None:
+            new_discs = list(self.get_outflanked_discs(position, current_player))
+        else:
+            new_discs = outflanked_discs
 
         self[position.row][position.col] = current_player
+        flips = 0
         for outflanked_pos in new_discs:
             self[outflanked_pos.row][outflanked_pos.col] = current_player
+            flips |= 1 << (outflanked_pos.row * self.width + outflanked_pos.col)
+
+        self.history.append((position.row * self.width + position.col, flips))
+        self._update_hash(position, new_discs, current_player)
+        self._update_frontier(position)
+        self._mobility.append({})
 
-        self.history.append((position, new_discs))
+    def get_move(self, index: int = -1) -> tuple[Position, list[Position]]:
+        """
+        Get a move from the history.
+
+        Args:
+            index (int): Index of the move in the history, the last move by default.
+
+        Returns:
+            tuple[Position, list[Position]]: The position where the disc was put
+                and the outflanked discs by result.
+        """
+        square, flips = self.history[index]
+        return self._squares.positions[square], self._decode(flips)
 
     def undo(self) -> None:
         """
@@ -102,13 +227,33 @@ class Board:
         if not self.history:
             raise ValueError("No moves to undo")
 
-        position, outflanked_discs = self.history.pop()
+        square, flips = self.history.pop()
+        position, outflanked_discs = self._squares.positions[square], self._decode(
+            flips
+        )
+        self._update_hash(position, outflanked_discs, self[position.row][position.col])
         opponent = get_opposing_player(self[position.row][position.col])
         self[position.row][position.col] = Cell.EMPTY
 
         for outflanked_pos in outflanked_discs:
             self[outflanked_pos.row][outflanked_pos.col] = opponent
 
+        self._update_frontier(position)
+        self._mobility.pop()
+
+    def get_cell(self, position: Position) -> Cell:
+        """
+        Get the cell at the given position, cheaper than indexing the rows of
+        the board on other implementations.
+
+        Args:
+            position (Position): The position of the cell.
+
+        Returns:
+            Cell: The cell.
+        """
+        return self.board[position.row][position.col]
+
     def is_in_bounds(self, position: Position) -> bool:
         """
         Check if the given position is within the bounds of the board.
@@ -120,3 +265,57 @@ class Board:
             bool: True if the position is within the bounds of the board, False otherwise.
         """
         return 0 <= position.row < self.height and 0 <= position.col < self.width
+
+    def _decode(self, mask: int) -> list[Position]:
+        """
+        Get the positions of the squares of a mask with the bits of a `Snapshot`.
+        """
+        return [self._squares.positions[index] for index in iterate_bits(mask)]
+
+    def _update_hash(
+        self, position: Position, outflanked_discs: list[Position], player: Cell
+    ) -> None:
+        """
+        Toggle the disc put by the player and the discs it outflanked in the hash,
+        which both applies and reverts the move.
+        """
+        own_keys = self._keys[player]
+        opponent_keys = self._keys[get_opposing_player(player)]
+        self.hash ^= own_keys[position.row][position.col]
+        for row, col in outflanked_discs:
+            self.hash ^= own_keys[row][col] ^ opponent_keys[row][col]
+
+    def _is_frontier(self, square: int) -> bool:
+        """
+        Check if the square with the given index is empty and adjacent to at least
+        one disc.
+        """
+        positions = self._squares.positions
+        cells = self.board
+        row, col = positions[square]
+        if cells[row][col] != Cell.EMPTY:
+            return False
+        for neighbor in self._squares.neighbors[square]:
+            row, col = positions[neighbor]
+            if cells[row][col] != Cell.EMPTY:
+                return True
+        return False
+
+    def _update_frontier(self, position: Position) -> None:
+        """
+        Update the frontier after the given position was filled or emptied,
+        which only affects the position itself and its neighbors.
+        """
+        square = position.row * self.width + position.col
+        for index in (square, *self._squares.neighbors[square]):
+            if self._is_frontier(index):
+                self.frontier.add(self._squares.positions[index])
+            else:
+                self.frontier.discard(self._squares.positions[index])
+
+    def _reset_frontier(self) -> None:
+        self.frontier = {
+            self._squares.positions[square]
+            for square in range(self.height * self.width)
+            if self._is_frontier(square)
+        }
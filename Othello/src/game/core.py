@@ -1,10 +1,7 @@
-from typing import Generator
-
 from game.position import Position
 
 from .board import Board
 from .cell import Cell
-from .rules import is_valid_move
 
 
 def is_game_over(board: Board) -> bool:
@@ -31,32 +28,25 @@ def can_play(board: Board, current_player: Cell) -> bool:
     Returns:
         bool: True if the current player can make a valid move, False otherwise.
     """
-    return any(
-        is_valid_move(board, Position(row, col), current_player)
-        for row in range(board.height)
-        for col in range(board.width)
-    )
+    for _ in board.get_valid_moves(current_player):
+        return True
+
+    return False
 
 
-def get_valid_moves(
-    board: Board, current_player: Cell
-) -> Generator[Position, None, None]:
+def get_valid_moves(board: Board, current_player: Cell) -> tuple[Position, ...]:
     """
-    Get the list of valid moves for the current player.
+    Get the valid moves for the current player.
 
     Args:
         board (Board): The game board.
         current_player (Cell): The player who is making the move.
 
     Returns:
-        list[Position]: The list of valid moves for the current player.
+        tuple[Position, ...]: The valid moves for the current player, empty (and so
+            falsy) if the player must pass.
     """
-    return (
-        Position(row, col)
-        for row in range(board.height)
-        for col in range(board.width)
-        if is_valid_move(board, Position(row, col), current_player)
-    )
+    return board.get_valid_moves(current_player)
 
 
 def get_scores(board: Board) -> dict[Cell, int]:
@@ -70,8 +60,8 @@ def get_scores(board: Board) -> dict[Cell, int]:
         dict[Cell, int]: The scores of the players.
     """
     return {
-        Cell.BLACK: sum(row.count(Cell.BLACK) for row in board),
-        Cell.WHITE: sum(row.count(Cell.WHITE) for row in board),
+        Cell.BLACK: board.count_discs(Cell.BLACK),
+        Cell.WHITE: board.count_discs(Cell.WHITE),
     }
 
 
@@ -0,0 +1,78 @@
+from .board import Board, Snapshot
+from .cell import Cell
+from .position import Position
+
+CELL_CHARS = {Cell.BLACK: "X", Cell.WHITE: "O", Cell.EMPTY: "."}
+CHAR_CELLS = {char: cell for cell, char in CELL_CHARS.items()}
+PASS = "pass"
+
+
+def format_position(board: Board, player: Cell) -> str:
+    """
+    Write the position as a single line of text: the rows of the board separated by
+    slashes, with X for black discs, O for white discs and dots for empty squares,
+    followed by a space and the player to move.
+
+    Args:
+        board (Board): The game board.
+        player (Cell): The player to move.
+
+    Returns:
+        str: The position, e.g. `..../.OX./.XO./.... X` for the start of a 4x4 game.
+    """
+    rows = "/".join("".join(CELL_CHARS[cell] for cell in row) for row in board)
+    return f"{rows} {CELL_CHARS[player]}"
+
+
+def parse_position(text: str) -> tuple[Snapshot, Cell]:
+    """
+    Read a position written by `format_position`.
+
+    Args:
+        text (str): The position.
+
+    Returns:
+        tuple[Snapshot, Cell]: Snapshot of the board and the player to move.
+
+    Raises:
+        ValueError: If the text is not a valid position.
+    """
+    try:
+        rows_text, player_char = text.split()
+        player = CHAR_CELLS[player_char]
+        rows = rows_text.split("/")
+        width = len(rows[0])
+        if player == Cell.EMPTY or any(len(row) != width for row in rows):
+            raise ValueError()
+
+        masks = {Cell.BLACK: 0, Cell.WHITE: 0, Cell.EMPTY: 0}
+        for row, cells in enumerate(rows):
+            for col, char in enumerate(cells):
+                masks[CHAR_CELLS[char]] |= 1 << (row * width + col)
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid position: {text!r}") from None
+
+    return Snapshot(len(rows), width, masks[Cell.BLACK], masks[Cell.WHITE]), player
+
+
+def format_move(move: Position | None) -> str:
+    """
+    Write the move as its column letter and row number, e.g. `d3`, or `pass`.
+    """
+    if move is None:
+        return PASS
+    return f"{chr(ord('a') + move.col)}{move.row + 1}"
+
+
+def parse_move(text: str) -> Position | None:
+    """
+    Read a move written by `format_move`, None for a pass.
+
+    Raises:
+        ValueError: If the text is not a valid move.
+    """
+    if text == PASS:
+        return None
+    if len(text) < 2 or not text[0].islower() or not text[1:].isdigit():
+        raise ValueError(f"Invalid move: {text!r}")
+    return Position(int(text[1:]) - 1, ord(text[0]) - ord("a"))
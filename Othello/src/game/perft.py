@@ -0,0 +1,184 @@
+"""
+Perft: the number of leaf positions of the game tree to a fixed depth, compared with
+reference counts to verify the move generation of the board backends and timed to
+compare their speed. Run from the `src` directory with
+
+    python -m game.perft --depth 6 --backend all
+
+A pass is a ply, and a finished game is a single leaf at the depth where it ended.
+The reference counts of the 8x8 start position are the published ones; those of the
+other positions were computed by an independent, naive implementation of the rules.
+"""
+
+import sys
+from argparse import ArgumentParser
+from collections import namedtuple
+from time import perf_counter
+
+from .bitboard import BACKENDS
+from .board import Board
+from .cell import Cell
+from .core import get_valid_moves
+from .notation import format_position, parse_position
+from .position import Position
+from .rules import is_valid_move
+from .squares import get_squares
+from .utils import get_opposing_player
+
+PerftCase = namedtuple("PerftCase", ["name", "position", "counts"])
+"""
+A position in the notation of `game.notation` and its perft counts from depth 1.
+"""
+
+CASES = (
+    PerftCase(
+        "start",
+        "......../......../......../...OX.../...XO.../......../......../........ X",
+        (4, 12, 56, 244, 1396, 8200, 55092, 390216),
+    ),
+    PerftCase(
+        "midgame",
+        "......../..O...../..OOO.O./X.OOXXXX/XXOOXOX./X..OXX../..OOXO../...O.... X",
+        (17, 161, 2486, 23817, 350032),
+    ),
+    PerftCase(
+        # Black must pass with 25 empty squares
+        "pass",
+        "..OOO.../.X.O..../..XX..../...XX.../...XX.../....X.../......../........ X",
+        (1, 3, 8, 58, 359, 3070),
+    ),
+    PerftCase(
+        # Discs on both side edges, where moves must not wrap around to the next row
+        "edges",
+        "O......X/X......O/O......X/X..XO..O/O..OX..X/X......O/O......X/X......O X",
+        (4, 12, 56, 252, 1470),
+    ),
+    PerftCase(
+        # Games finishing before the depth, with and without filling the board
+        "endgame",
+        ".OOO...O/.OOXXX.O/OOOOXXXO/OOXOOXXO/OXOOOXXO/OOXOXOOO/O.XXXXOO/..XO.O.O O",
+        (8, 40, 232, 1143, 4893, 19860, 62712, 180285, 373249, 599634, 634459),
+    ),
+    PerftCase(
+        "start4x4",
+        "..../.OX./.XO./.... X",
+        (4, 12, 44, 128, 424, 1256, 3624, 9116, 20044, 36540, 50704, 57436),
+    ),
+    PerftCase(
+        "start6x6",
+        "....../....../..OX../..XO../....../...... X",
+        (4, 12, 56, 244, 1364, 7604, 47740),
+    ),
+    PerftCase(
+        "start6x8",
+        "......../......../...OX.../...XO.../......../........ X",
+        (4, 12, 56, 244, 1380, 7892),
+    ),
+    PerftCase(
+        "start10x10",
+        "........../........../........../........../....OX..../"
+        "....XO..../........../........../........../.......... X",
+        (4, 12, 56, 244),
+    ),
+)
+
+
+def perft(board: Board, player: Cell, depth: int, check_rules: bool = False) -> int:
+    """
+    Count the leaf positions of the game tree to the given depth.
+
+    Args:
+        board (Board): The game board, restored when the count returns.
+        player (Cell): The player to move.
+        depth (int): Number of plies.
+        check_rules (bool): Whether to check in every position that `rules.is_valid_move`
+            accepts exactly the generated moves, which is much slower.
+
+    Returns:
+        int: The number of leaves.
+
+    Raises:
+        ValueError: If `rules.is_valid_move` disagrees with the generated moves.
+    """
+    if depth == 0:
+        return 1
+
+    moves = tuple(get_valid_moves(board, player))
+    if check_rules:
+        _check_moves(board, player, moves)
+
+    opponent = get_opposing_player(player)
+    if not moves:
+        if not board.get_valid_moves(opponent):
+            return 1
+        return perft(board, opponent, depth - 1, check_rules)
+    if depth == 1 and not check_rules:
+        return len(moves)
+
+    count = 0
+    for move in moves:
+        board.put_disc(move, player)
+        count += perft(board, opponent, depth - 1, check_rules)
+        board.undo()
+    return count
+
+
+def _check_moves(board: Board, player: Cell, moves: tuple[Position, ...]) -> None:
+    positions = get_squares(board.height, board.width).positions
+    valid = {
+        position for position in positions if is_valid_move(board, position, player)
+    }
+    if valid != set(moves):
+        raise ValueError(
+            f"Moves {sorted(moves)} of {player.name} differ from the valid moves "
+            f"{sorted(valid)} in {format_position(board, player)}"
+        )
+
+
+def run_case(
+    case: PerftCase, backend: type[Board], depth: int, check_rules: bool = False
+) -> tuple[int, float]:
+    """
+    Count the leaves of a case to the given depth on a board backend.
+
+    Returns:
+        tuple[int, float]: The number of leaves and the time taken in seconds.
+    """
+    snapshot, player = parse_position(case.position)
+    board = backend.from_snapshot(snapshot)
+    start = perf_counter()
+    count = perft(board, player, depth, check_rules)
+    return count, perf_counter() - start
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Verify and time the move generation.")
+    parser.add_argument("--depth", type=int, default=6, help="maximal depth")
+    parser.add_argument("--backend", choices=[*BACKENDS, "all"], default="all")
+    parser.add_argument("--case", choices=[case.name for case in CASES])
+    parser.add_argument("--check-rules", action="store_true")
+    args = parser.parse_args()
+
+    backends = BACKENDS if args.backend == "all" else [args.backend]
+    failures = 0
+    for case in CASES:
+        if args.case is not None and case.name != args.case:
+            continue
+
+        for name in backends:
+            for depth, expected in enumerate(case.counts[: args.depth], 1):
+                count, elapsed = run_case(case, BACKENDS[name], depth, args.check_rules)
+                status = "ok" if count == expected else f"FAILED, expected {expected}"
+                failures += count != expected
+                print(
+                    f"{case.name:<10} {name:<8} depth {depth:>2}: {count:>10} {status}"
+                    f" ({count / max(elapsed, 1e-9):,.0f} leaves/s)"
+                )
+
+    if failures:
+        print(f"{failures} counts differ from the reference")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
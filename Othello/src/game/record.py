@@ -0,0 +1,156 @@
+"""
+Compact binary records of games. A file holds any number of records one after another,
+each of them a header followed by one byte per move: the square of the move as
+`row * width + col`. Passes are not recorded, as they are implied by the rules.
+"""
+
+import struct
+from collections import namedtuple
+from collections.abc import Iterable, Iterator
+from functools import cache
+from typing import BinaryIO
+
+from .bitboard import BitBoard, get_flips, get_geometry, get_moves, to_flat
+from .board import Snapshot
+from .cell import Cell
+from .position import Position
+from .utils import get_opposing_player
+
+MAGIC = b"OTHG"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBH")
+"""
+Magic, version, height, width and number of moves.
+"""
+
+GameRecord = namedtuple("GameRecord", ["height", "width", "moves"])
+"""
+A game of a board of the given size, with the squares of its moves in a bytes object.
+"""
+
+
+def create_record(height: int, width: int, moves: Iterable[Position]) -> GameRecord:
+    """
+    Create the record of a game from its moves.
+
+    Raises:
+        ValueError: If the board has more than 256 squares.
+    """
+    if height * width > 256:
+        raise ValueError("Boards with more than 256 squares cannot be recorded")
+    return GameRecord(height, width, bytes(row * width + col for row, col in moves))
+
+
+def write_record(file: BinaryIO, record: GameRecord) -> None:
+    """
+    Write the record at the current position of a binary file.
+    """
+    file.write(
+        HEADER.pack(MAGIC, VERSION, record.height, record.width, len(record.moves))
+    )
+    file.write(record.moves)
+
+
+def read_records(file: BinaryIO) -> Iterator[GameRecord]:
+    """
+    Read the records of a binary file one by one until its end.
+
+    Raises:
+        ValueError: If the file does not contain valid records.
+    """
+    while header := file.read(HEADER.size):
+        if len(header) < HEADER.size:
+            raise ValueError("Truncated game record")
+        magic, version, height, width, length = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a game record")
+
+        moves = file.read(length)
+        if len(moves) < length:
+            raise ValueError("Truncated game record")
+        yield GameRecord(height, width, moves)
+
+
+@cache
+def _get_start(height: int, width: int) -> tuple[int, int]:
+    board = BitBoard(height, width)
+    return board.black, board.white
+
+
+def _replay(record: GameRecord) -> Iterator[tuple[Cell, int, int, int | None]]:
+    """
+    Replay a game on masks in the bit layout of `BitBoard`.
+
+    Returns:
+        Iterator[tuple[Cell, int, int, int | None]]: The player to move, its discs and
+            those of its opponent before every move and the square of the move, then
+            after the last move with None.
+    """
+    geometry = get_geometry(record.height, record.width)
+    stride, width = geometry.stride, record.width
+    player = Cell.BLACK
+    own, opponent = _get_start(record.height, record.width)
+
+    for square in record.moves:
+        if square >= record.height * width:
+            raise ValueError(f"Invalid square {square}")
+
+        move = 1 << (square // width * stride + square % width)
+        flips = get_flips(own, opponent, move, geometry)
+        if not flips and not get_moves(own, opponent, geometry):
+            player = get_opposing_player(player)
+            own, opponent = opponent, own
+            flips = get_flips(own, opponent, move, geometry)
+        if not flips or (own | opponent) & move:
+            raise ValueError(
+                f"Invalid move {Position(*divmod(square, width))} of {player.name}"
+            )
+
+        yield player, own, opponent, square
+        own, opponent = opponent & ~flips, own | move | flips
+        player = get_opposing_player(player)
+
+    yield player, own, opponent, None
+
+
+def _snapshot(record: GameRecord, player: Cell, own: int, opponent: int) -> Snapshot:
+    geometry = get_geometry(record.height, record.width)
+    black, white = (own, opponent) if player == Cell.BLACK else (opponent, own)
+    return Snapshot(
+        record.height, record.width, to_flat(black, geometry), to_flat(white, geometry)
+    )
+
+
+def iterate_positions(
+    record: GameRecord,
+) -> Iterator[tuple[Snapshot, Cell, Position]]:
+    """
+    Replay a game and iterate over the positions in which its moves were played.
+
+    Args:
+        record (GameRecord): The game.
+
+    Returns:
+        Iterator[tuple[Snapshot, Cell, Position]]: The board before every move,
+            the player who made it and the move.
+
+    Raises:
+        ValueError: If a move of the game is not valid.
+    """
+    for player, own, opponent, square in _replay(record):
+        if square is not None:
+            yield _snapshot(record, player, own, opponent), player, Position(
+                *divmod(square, record.width)
+            )
+
+
+def replay(record: GameRecord) -> Snapshot:
+    """
+    Replay a game and get its final position.
+
+    Raises:
+        ValueError: If a move of the game is not valid.
+    """
+    for player, own, opponent, _ in _replay(record):
+        pass
+    return _snapshot(record, player, own, opponent)
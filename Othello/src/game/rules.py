@@ -2,7 +2,7 @@ from game.position import Position
 
 from .board import Board
 from .cell import Cell
-from .utils import neighbors
+from .squares import get_squares
 
 
 def is_empty(board: Board, row: int, col: int) -> bool:
@@ -66,10 +66,9 @@ def is_adjacent_to_opponent(
     if Cell == Cell.EMPTY:
         raise ValueError("Current player cell cannot be empty")
 
-    for (nrow, ncol), _ in neighbors(row, col):
-        if not board.is_in_bounds(Position(nrow, ncol)):
-            continue
-
+    squares = get_squares(board.height, board.width)
+    for neighbor in squares.neighbors[row * board.width + col]:
+        nrow, ncol = squares.positions[neighbor]
         if board[nrow][ncol] != current_player:
             return True
 
@@ -91,7 +90,7 @@ def is_valid_move(board: Board, position: Position, current_player: Cell) -> boo
     """
     row, col = position
     return (
-        board.is_in_bounds(Position(row, col))
+        board.is_in_bounds(position)
         and is_empty(board, row, col)
         and is_adjacent_to_opponent(board, row, col, current_player)
         and outflanks_opponent(board, row, col, current_player)
@@ -0,0 +1,52 @@
+from collections import namedtuple
+from functools import cache
+
+from .position import Position
+from .utils import DIRECTIONS
+
+Squares = namedtuple("Squares", ["height", "width", "positions", "neighbors", "rays"])
+"""
+Tables of the squares of a board of the given size, which are numbered by their flat
+index `row * width + col`, built once per size so that the loops over the board do not
+create positions or check bounds.
+
+- `positions[index]` is the position of the square,
+- `neighbors[index]` are the indices of the squares around it on the board,
+- `rays[index]` are the `(direction, ray)` pairs of the directions with at least one
+  square, where `ray` are the indices of the squares from the nearest one to the edge.
+"""
+
+
+@cache
+def get_squares(height: int, width: int) -> Squares:
+    """
+    Get the tables of the squares of a board of the given size.
+
+    Args:
+        height (int): Height of the board.
+        width (int): Width of the board.
+
+    Returns:
+        Squares: The tables.
+    """
+    positions = tuple(
+        Position(row, col) for row in range(height) for col in range(width)
+    )
+    directions = [Position(*direction) for direction in sorted(DIRECTIONS)]
+
+    neighbors = []
+    rays = []
+    for row, col in positions:
+        square_rays = []
+        for direction in directions:
+            ray = []
+            ray_row, ray_col = row + direction.row, col + direction.col
+            while 0 <= ray_row < height and 0 <= ray_col < width:
+                ray.append(ray_row * width + ray_col)
+                ray_row, ray_col = ray_row + direction.row, ray_col + direction.col
+            if ray:
+                square_rays.append((direction, tuple(ray)))
+        neighbors.append(tuple(ray[0] for _, ray in square_rays))
+        rays.append(tuple(square_rays))
+
+    return Squares(height, width, positions, tuple(neighbors), tuple(rays))
@@ -0,0 +1,167 @@
+"""
+Symmetries of the board, to store positions that are the same up to a rotation or
+a reflection once.
+
+A square board has 8 symmetries, a rectangular one the 4 that keep its shape. The canonical
+form of a position is its image with the smallest masks over all symmetries, and its
+canonical key is the Zobrist hash of that form, so all images of a position share a key.
+A best move is stored in the frame of the canonical form, with `transform_position`, and
+mapped back to the position looked up with the inverse of its symmetry.
+"""
+
+from collections import namedtuple
+from functools import cache
+
+from .board import Board, Snapshot
+from .cell import Cell
+from .position import Position
+from .utils import iterate_bits
+from .zobrist import PLAYER_KEYS, get_zobrist_keys
+
+CHUNK_BITS = 8
+"""
+Number of bits of a mask transformed by one table lookup.
+"""
+
+Symmetry = namedtuple("Symmetry", ["name", "squares", "inverse", "tables"])
+"""
+A symmetry of a board of the given size, on the squares numbered `row * width + col`.
+
+- `squares[index]` is the square that the square `index` is mapped to,
+- `inverse` is the index of the symmetry undoing it,
+- `tables[chunk][bits]` is the image of a mask of the given bits of the chunk, the bits
+  `chunk * CHUNK_BITS` and up of the mask.
+"""
+
+
+@cache
+def get_symmetries(height: int, width: int) -> tuple[Symmetry, ...]:
+    """
+    Get the symmetries of a board of the given size, the identity first.
+
+    Args:
+        height (int): Height of the board.
+        width (int): Width of the board.
+
+    Returns:
+        tuple[Symmetry, ...]: The symmetries.
+    """
+    last_row, last_col = height - 1, width - 1
+    maps = {
+        "identity": lambda row, col: (row, col),
+        "rotate180": lambda row, col: (last_row - row, last_col - col),
+        "mirror_rows": lambda row, col: (last_row - row, col),
+        "mirror_cols": lambda row, col: (row, last_col - col),
+    }
+    if height == width:
+        maps["rotate90"] = lambda row, col: (col, last_row - row)
+        maps["rotate270"] = lambda row, col: (last_col - col, row)
+        maps["transpose"] = lambda row, col: (col, row)
+        maps["anti_transpose"] = lambda row, col: (last_col - col, last_row - row)
+
+    mappings = []
+    for function in maps.values():
+        mapping = []
+        for row in range(height):
+            for col in range(width):
+                new_row, new_col = function(row, col)
+                mapping.append(new_row * width + new_col)
+        mappings.append(tuple(mapping))
+
+    symmetries = []
+    for name, squares in zip(maps, mappings):
+        inverse = next(
+            index
+            for index, other in enumerate(mappings)
+            if all(other[square] == index for index, square in enumerate(squares))
+        )
+        tables = []
+        for start in range(0, height * width, CHUNK_BITS):
+            bits = min(CHUNK_BITS, height * width - start)
+            table = [0] * (1 << bits)
+            for value in range(1, 1 << bits):
+                lowest = (value & -value).bit_length() - 1
+                table[value] = table[value & (value - 1)] | 1 << squares[start + lowest]
+            tables.append(tuple(table))
+        symmetries.append(Symmetry(name, squares, inverse, tuple(tables)))
+
+    return tuple(symmetries)
+
+
+def transform_mask(mask: int, symmetry: Symmetry) -> int:
+    """
+    Get the image of a mask with the bits of a `Snapshot` by a symmetry.
+    """
+    chunk_mask = (1 << CHUNK_BITS) - 1
+    image = 0
+    for table in symmetry.tables:
+        if not mask:
+            break
+        image |= table[mask & chunk_mask]
+        mask >>= CHUNK_BITS
+    return image
+
+
+def transform_position(position: Position, symmetry: Symmetry, width: int) -> Position:
+    """
+    Get the image of a position by a symmetry of a board of the given width.
+    """
+    square = symmetry.squares[position.row * width + position.col]
+    return Position(*divmod(square, width))
+
+
+def canonicalize(snapshot: Snapshot) -> tuple[Snapshot, int]:
+    """
+    Get the canonical form of a position, the same for all its images.
+
+    Args:
+        snapshot (Snapshot): The position.
+
+    Returns:
+        tuple[Snapshot, int]: The canonical form and the index in `get_symmetries` of
+            the symmetry mapping the position to it.
+    """
+    height, width = snapshot.height, snapshot.width
+    best = (snapshot.black, snapshot.white)
+    best_index = 0
+    for index, symmetry in enumerate(get_symmetries(height, width)[1:], 1):
+        image = (
+            transform_mask(snapshot.black, symmetry),
+            transform_mask(snapshot.white, symmetry),
+        )
+        if image < best:
+            best, best_index = image, index
+    return Snapshot(height, width, *best), best_index
+
+
+def get_canonical_key(board: Board, player: Cell) -> tuple[int, Symmetry]:
+    """
+    Get the key of the position with the given player to move, shared by all images of
+    the position.
+
+    Args:
+        board (Board): The game board.
+        player (Cell): The player to move.
+
+    Returns:
+        tuple[int, Symmetry]: The unsigned 64-bit key and the symmetry mapping
+            the position to its canonical form.
+    """
+    canonical, index = canonicalize(board.snapshot())
+    width = board.width
+    keys = get_zobrist_keys(board.height, width)
+    key = PLAYER_KEYS[player]
+    for cell, mask in ((Cell.BLACK, canonical.black), (Cell.WHITE, canonical.white)):
+        cell_keys = keys[cell]
+        for square in iterate_bits(mask):
+            row, col = divmod(square, width)
+            key ^= cell_keys[row][col]
+    return key, get_symmetries(board.height, width)[index]
+
+
+def get_inverse(symmetry: Symmetry, height: int, width: int) -> Symmetry:
+    """
+    Get the symmetry undoing the given one, mapping a move stored in the canonical frame
+    back to the position that was looked up.
+    """
+    return get_symmetries(height, width)[symmetry.inverse]
@@ -31,3 +31,19 @@ def get_opposing_player(current_player: Cell) -> Cell:
         Cell: The opposing player.
     """
     return Cell.WHITE if current_player == Cell.BLACK else Cell.BLACK
+
+
+def iterate_bits(mask: int) -> Generator[int, None, None]:
+    """
+    Iterate over the indices of the set bits of a mask, from the lowest one.
+
+    Args:
+        mask (int): The mask.
+
+    Returns:
+        Generator[int, None, None]: Generator of the bit indices.
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
@@ -0,0 +1,54 @@
+from functools import cache
+from random import Random
+
+from .cell import Cell
+
+ZobristKeys = dict[Cell, list[list[int]]]
+
+
+@cache
+def get_zobrist_keys(height: int, width: int) -> ZobristKeys:
+    """
+    Get the random 64-bit keys of every (player, square) pair of a board of the given size.
+
+    The keys are generated from a fixed seed, so hashes are the same in every process
+    and can be stored on disk.
+
+    Args:
+        height (int): Height of the board.
+        width (int): Width of the board.
+
+    Returns:
+        ZobristKeys: The keys, indexed by the cell type, row and column.
+    """
+    random = Random(f"othello-zobrist-{height}x{width}")
+    return {
+        player: [[random.getrandbits(64) for _ in range(width)] for _ in range(height)]
+        for player in (Cell.BLACK, Cell.WHITE)
+    }
+
+
+PLAYER_KEYS = {Cell.BLACK: 0, Cell.WHITE: Random("othello-zobrist").getrandbits(64)}
+"""
+Keys of the player to move, to be combined with the board hash when the same discs
+with a different player to move must be told apart.
+"""
+
+
+def hash_cells(board: list[list[Cell]], keys: ZobristKeys) -> int:
+    """
+    Compute the Zobrist hash of the given cells from scratch.
+
+    Args:
+        board (list[list[Cell]]): Rows of the board.
+        keys (ZobristKeys): The keys of the board size.
+
+    Returns:
+        int: The hash, the XOR of the keys of all discs.
+    """
+    value = 0
+    for row, cells in enumerate(board):
+        for col, cell in enumerate(cells):
+            if cell != Cell.EMPTY:
+                value ^= keys[cell][row][col]
+    return value
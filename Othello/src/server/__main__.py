@@ -0,0 +1,26 @@
+import asyncio
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import BOT_TIME_LIMIT, GameServer, serve
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Serve Othello games over JSON lines.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="path of a Unix socket to listen on instead")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=BOT_TIME_LIMIT)
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(args.workers) as executor:
+        server = GameServer(executor, args.time_limit)
+        try:
+            asyncio.run(serve(server, args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
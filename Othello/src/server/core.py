@@ -0,0 +1,195 @@
+"""
+Game server hosting many concurrent games, run from the `src` directory with
+
+    python -m server --port 7777
+
+Clients send requests as JSON objects, one per line, and receive one JSON object per
+line in reply. The `type` of a request is one of
+
+- `new`: start a game, with optional `size` (8) and `bot` (`white`, `black` or null),
+- `move`: play `move` (e.g. `d3`), answered after the bot's replies if it plays,
+- `state`: get the state of the game,
+- `metrics`: get the latencies of the session and of the whole server.
+
+Replies are either the state of the game, the metrics, or an `error` with a `message`.
+The moves of the bot are searched in a pool of processes, so that a long search never
+stalls the other sessions.
+"""
+
+import asyncio
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import count
+from time import perf_counter
+
+from agent import pick_best_turn
+from game.bitboard import BitBoard
+from game.board import Snapshot
+from game.cell import Cell
+from game.notation import format_move, parse_move
+from game.position import Position
+
+from .metrics import LatencyMetrics
+from .session import Session
+
+BOT_TIME_LIMIT = 0.5  # seconds
+PLAYERS = {"black": Cell.BLACK, "white": Cell.WHITE, None: None}
+
+
+def _pick_bot_move(snapshot: Snapshot, player: Cell, time_limit: float) -> Position:
+    board = BitBoard.from_snapshot(snapshot)
+    return pick_best_turn(board, player, time_limit=time_limit)
+
+
+class GameServer:
+    """
+    Server of Othello games over newline-delimited JSON, one game per connection.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        bot_time_limit: float = BOT_TIME_LIMIT,
+    ) -> None:
+        """
+        Initialize the server.
+
+        Args:
+            executor (Executor | None): Executor of the bot's searches, a pool with
+                a process per CPU if not given.
+            bot_time_limit (float): Time budget of a move of the bot in seconds.
+        """
+        self.executor = ProcessPoolExecutor() if executor is None else executor
+        self.bot_time_limit = bot_time_limit
+        self.sessions: dict[int, Session] = {}
+        self.requests = LatencyMetrics()
+        self.bot_moves = LatencyMetrics()
+        self._ids = count(1)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Serve the requests of a client until it disconnects.
+        """
+        session = Session(next(self._ids))
+        self.sessions[session.id] = session
+        try:
+            while line := await reader.readline():
+                start = perf_counter()
+                reply = await self.handle_request(session, line)
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+
+                latency = perf_counter() - start
+                session.requests.add(latency)
+                self.requests.add(latency)
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[session.id]
+            writer.close()
+
+    async def handle_request(self, session: Session, line: bytes) -> dict:
+        """
+        Handle a single request of the session.
+
+        Args:
+            session (Session): The session of the client.
+            line (bytes): The request, as a line of JSON.
+
+        Returns:
+            dict: The reply.
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+
+            match request.get("type"):
+                case "new":
+                    size, bot = request.get("size", 8), request.get("bot", "white")
+                    if not isinstance(size, int):
+                        raise ValueError(f"Invalid size: {size!r}")
+                    if not isinstance(bot, str | None) or bot not in PLAYERS:
+                        raise ValueError(f"Invalid bot: {bot!r}")
+                    session.new_game(size, PLAYERS[bot])
+                    replies = await self._play_bot(session)
+                case "move":
+                    move = parse_move(str(request.get("move")))
+                    if move is None:
+                        raise ValueError("Passes are played automatically")
+                    session.play(move)
+                    replies = await self._play_bot(session)
+                case "state":
+                    replies = []
+                case "metrics":
+                    return {"type": "metrics", **self.get_metrics(session)}
+                case _:
+                    raise ValueError(f"Invalid request type: {request.get('type')!r}")
+            return {"type": "state", "bot_moves": replies, **session.get_state()}
+        except ValueError as error:
+            return {"type": "error", "message": str(error)}
+
+    def get_metrics(self, session: Session) -> dict[str, object]:
+        """
+        Get the latencies of the session and of all sessions of the server.
+        """
+        return {
+            "session": {
+                "id": session.id,
+                "requests": session.requests.to_dict(),
+                "bot_moves": session.bot_moves.to_dict(),
+            },
+            "server": {
+                "sessions": len(self.sessions),
+                "requests": self.requests.to_dict(),
+                "bot_moves": self.bot_moves.to_dict(),
+            },
+        }
+
+    async def _play_bot(self, session: Session) -> list[str]:
+        """
+        Play the moves of the bot until the client is to move or the game is over.
+
+        Returns:
+            list[str]: The moves of the bot.
+        """
+        loop = asyncio.get_running_loop()
+        moves = []
+        while session.is_bot_to_move():
+            assert session.board is not None
+
+            start = perf_counter()
+            move = await loop.run_in_executor(
+                self.executor,
+                _pick_bot_move,
+                session.board.snapshot(),
+                session.player,
+                self.bot_time_limit,
+            )
+            latency = perf_counter() - start
+            session.bot_moves.add(latency)
+            self.bot_moves.add(latency)
+
+            session.play(move)
+            moves.append(format_move(move))
+        return moves
+
+
+async def serve(
+    server: GameServer,
+    host: str = "127.0.0.1",
+    port: int = 7777,
+    path: str | None = None,
+) -> None:
+    """
+    Serve the games forever on a TCP port, or on a Unix socket if a path is given.
+    """
+    if path is None:
+        listener = await asyncio.start_server(server.handle_connection, host, port)
+    else:
+        listener = await asyncio.start_unix_server(server.handle_connection, path)
+
+    async with listener:
+        await listener.serve_forever()
@@ -0,0 +1,47 @@
+from collections import deque
+from math import ceil
+
+SAMPLES = 1000
+"""
+Number of the most recent latencies kept for the percentiles.
+"""
+
+
+class LatencyMetrics:
+    """
+    Latencies of some operation: their count, average and maximum over all of them,
+    and percentiles over the most recent ones.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.samples: deque[float] = deque(maxlen=SAMPLES)
+
+    def add(self, latency: float) -> None:
+        """
+        Record a latency in seconds.
+        """
+        self.count += 1
+        self.total += latency
+        self.maximum = max(self.maximum, latency)
+        self.samples.append(latency)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get the given percentile of the recent latencies, 0 if there are none.
+        """
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        return samples[max(0, ceil(percent / 100 * len(samples)) - 1)]
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "average": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.maximum,
+        }
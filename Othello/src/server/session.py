@@ -0,0 +1,99 @@
+from game.bitboard import BitBoard
+from game.cell import Cell
+from game.core import can_play, get_scores, get_valid_moves, is_game_over
+from game.notation import format_move, format_position
+from game.position import Position
+from game.rules import is_valid_move
+from game.utils import get_opposing_player
+
+from .metrics import LatencyMetrics
+
+MIN_SIZE = 4
+MAX_SIZE = 16
+
+
+class Session:
+    """
+    Connection of a client to the server, with the game it plays and its metrics.
+    """
+
+    def __init__(self, session_id: int) -> None:
+        self.id = session_id
+        self.board: BitBoard | None = None
+        self.player = Cell.BLACK
+        self.bot: Cell | None = None
+        self.requests = LatencyMetrics()
+        self.bot_moves = LatencyMetrics()
+
+    def new_game(self, size: int = 8, bot: Cell | None = Cell.WHITE) -> None:
+        """
+        Start a new game, black moves first.
+
+        Args:
+            size (int): Height and width of the board.
+            bot (Cell | None): The player played by the bot, None for a game of two
+                humans taking turns on the same connection.
+
+        Raises:
+            ValueError: If the size is not supported.
+        """
+        if not MIN_SIZE <= size <= MAX_SIZE or size % 2:
+            raise ValueError(
+                f"Board size must be even and between {MIN_SIZE} and {MAX_SIZE}"
+            )
+        self.board = BitBoard(size, size)
+        self.player = Cell.BLACK
+        self.bot = bot
+
+    def play(self, move: Position) -> None:
+        """
+        Play a move of the player to move, then pass for the next player if it has
+        no valid move.
+
+        Raises:
+            ValueError: If no game is started or the move is not valid.
+        """
+        board = self._get_board()
+        if is_game_over(board) or not is_valid_move(board, move, self.player):
+            raise ValueError(f"Invalid move: {format_move(move)}")
+
+        board.put_disc(move, self.player)
+        self.player = get_opposing_player(self.player)
+        if not is_game_over(board) and not can_play(board, self.player):
+            self.player = get_opposing_player(self.player)
+
+    def is_bot_to_move(self) -> bool:
+        return (
+            self.board is not None
+            and self.player == self.bot
+            and not is_game_over(self.board)
+        )
+
+    def get_state(self) -> dict[str, object]:
+        """
+        Get the state of the game to be sent to the client.
+
+        Raises:
+            ValueError: If no game is started.
+        """
+        board = self._get_board()
+        scores = get_scores(board)
+        over = is_game_over(board)
+        winner = None
+        if over and scores[Cell.BLACK] != scores[Cell.WHITE]:
+            winner = max((Cell.BLACK, Cell.WHITE), key=scores.__getitem__).name.lower()
+        return {
+            "position": format_position(board, self.player),
+            "player": self.player.name.lower(),
+            "moves": [
+                format_move(move) for move in get_valid_moves(board, self.player)
+            ],
+            "scores": {"black": scores[Cell.BLACK], "white": scores[Cell.WHITE]},
+            "over": over,
+            "winner": winner,
+        }
+
+    def _get_board(self) -> BitBoard:
+        if self.board is None:
+            raise ValueError("No game started")
+        return self.board